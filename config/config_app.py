@@ -17,6 +17,72 @@ class Config:
     GITHUB_USER_API_URL = "https://api.github.com/user"
     GITHUB_REDIRECT_URI = os.getenv("GITHUB_REDIRECT_URI")
     WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL")
+    # Секрет подписи событий GitHub Webhook: отдельный от SECRET_KEY, который подписывает токены приложения
+    GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
     
     REDIS_URL = "redis://localhost:6379/0"
     REDIS_EXPIRE_SECONDS = 600
+    
+    ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", os.cpu_count() or 1))
+    # Дополнительные шаблоны в синтаксисе .gitignore (через запятую), которые не попадают в анализ
+    ANALYSIS_IGNORE = [pattern.strip() for pattern in os.getenv("ANALYSIS_IGNORE", "").split(",") if pattern.strip()]
+    ANALYSIS_MAX_FILE_BYTES = int(os.getenv("ANALYSIS_MAX_FILE_BYTES", 1_000_000))
+    # Откуда берутся файлы репозитория с GitHub: git - постоянное зеркало, api - файлы ревизии через REST API без git,
+    # tarball - архив ревизии, распакованный из потока ответа
+    REPO_FETCH_MODE = os.getenv("REPO_FETCH_MODE", "git").lower()
+    # Репозитории с GitHub читаются прямо из объектов зеркала (git ls-tree + cat-file) без рабочей копии на диске
+    ANALYSIS_FROM_GIT_OBJECTS = os.getenv("ANALYSIS_FROM_GIT_OBJECTS", "true").lower() in ("1", "true", "yes")
+    # Предел распакованного объема загруженного архива (защита от zip-бомб)
+    ARCHIVE_MAX_EXTRACTED_BYTES = int(os.getenv("ARCHIVE_MAX_EXTRACTED_BYTES", 2 * 1024 * 1024 * 1024))
+    
+    # Кэш ответов модели по содержимому фрагмента кода
+    DOC_CACHE_PATH = os.getenv("DOC_CACHE_PATH", "storage/doc_cache.sqlite")
+    DOC_CACHE_MAX_BYTES = int(os.getenv("DOC_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    DOC_CACHE_MAX_AGE_SECONDS = int(os.getenv("DOC_CACHE_MAX_AGE_SECONDS", 30 * 24 * 3600))
+    
+    # Лимиты запросов к модели: одновременные запросы, запросы и токены в минуту, повторы на 429/5xx
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 300))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 500_000))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+    # Лимиты запросов и токенов в минуту общие для всех процессов веб-сервера и воркеров (в Redis), иначе у каждого процесса свои
+    LLM_SHARED_LIMITS = os.getenv("LLM_SHARED_LIMITS", "true").lower() in ("1", "true", "yes")
+    # Ожидаемый размер ответа в токенах для резервирования лимита до получения usage
+    LLM_OUTPUT_TOKENS_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKENS_ESTIMATE", 2000))
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 300))
+    
+    # Пулы соединений общих HTTP-клиентов
+    GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", 20))
+    # Одновременных запросов при скачивании файлов репозитория через API
+    GITHUB_DOWNLOAD_CONCURRENCY = int(os.getenv("GITHUB_DOWNLOAD_CONCURRENCY", 8))
+    HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", 60))
+    
+    # Контекст модели и целевой размер фрагмента кода в токенах (из контекста вычитаются промт и ответ)
+    LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", 64_000))
+    LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", 6000))
+    # Каталог словаря tiktoken: заполняется при установке (python -m src.utils.tokenizer), во время работы словарь не скачивается
+    TIKTOKEN_CACHE_DIR = os.getenv("TIKTOKEN_CACHE_DIR", "storage/tiktoken")
+    
+    # Пакетный режим: мелкие файлы одной группы отправляются одним запросом (файл, пакет целиком, число файлов)
+    DOC_BATCH_FILE_MAX_TOKENS = int(os.getenv("DOC_BATCH_FILE_MAX_TOKENS", 1000))
+    DOC_BATCH_MAX_TOKENS = int(os.getenv("DOC_BATCH_MAX_TOKENS", 4000))
+    DOC_BATCH_MAX_FILES = int(os.getenv("DOC_BATCH_MAX_FILES", 8))
+    # Документация дописывается в файл по мере ответа модели, а не после последнего фрагмента
+    DOC_STREAMING = os.getenv("DOC_STREAMING", "true").lower() in ("1", "true", "yes")
+    
+    # Очередь задач обработки репозиториев: лимиты одновременных задач (всего и на пользователя), попытки, аренда воркера
+    JOB_MAX_RUNNING = int(os.getenv("JOB_MAX_RUNNING", 8))
+    JOB_MAX_RUNNING_PER_USER = int(os.getenv("JOB_MAX_RUNNING_PER_USER", 2))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 120))
+    JOB_RETRY_DELAY_SECONDS = int(os.getenv("JOB_RETRY_DELAY_SECONDS", 30))
+    JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 7 * 24 * 3600))
+    # Задач одновременно в одном процессе воркера и пауза опроса пустой очереди
+    JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", 2))
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+    
+    # Обновление по push: кроме измененных файлов перегенерировать документацию файлов, которые их импортируют
+    WEBHOOK_REGENERATE_DEPENDENTS = os.getenv("WEBHOOK_REGENERATE_DEPENDENTS", "false").lower() in ("1", "true", "yes")
+    
+    # Общий объем постоянных зеркал репозиториев в storage/repo_clones, сверх него удаляются давно не использованные
+    REPO_MIRRORS_MAX_BYTES = int(os.getenv("REPO_MIRRORS_MAX_BYTES", 10 * 1024 * 1024 * 1024))
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
+from src.redis import redis_service
+from src.services.job_queue import job_queue
 import uuid
 
 router = APIRouter()
@@ -9,16 +11,20 @@ templates = Jinja2Templates(directory="templates")
 @router.get("/{user_id}/{repo_id}")
 async def get_documentation(request: Request, user_id: str, repo_id: str):
     docs_path = Path(f"storage/docs/{user_id}/{repo_id}")
-    if not docs_path.exists():
+    generation = await _generation_status(repo_id)
+    if not docs_path.exists() and generation is None:
         raise HTTPException(status_code=404, detail="Documentation not found")
     
+    # Пока идет генерация, показываются уже готовые файлы
     project_structure = []
-    for group_dir in docs_path.glob("group_*"):
+    for group_dir in sorted(docs_path.glob("group_*"), key=lambda path: int(path.name.split("_")[-1])):
         group_files = []
-        for md_file in group_dir.glob("*.md"):
+        # Документы лежат по путям файлов в репозитории
+        for md_file in sorted(group_dir.rglob("*.md")):
+            rel_path = md_file.relative_to(group_dir).as_posix()
             group_files.append({
-                "name": md_file.stem,
-                "path": f"{group_dir.name}/{md_file.name}"
+                "name": rel_path[:-3],
+                "path": f"{group_dir.name}/{rel_path}"
             })
         project_structure.append({
             "group": group_dir.name,
@@ -30,9 +36,18 @@ async def get_documentation(request: Request, user_id: str, repo_id: str):
         "project_structure": project_structure,
         "user_id": user_id,
         "repo_id": repo_id,
-        "initial_file": project_structure[0]["files"][0]["path"] if project_structure else None
+        "generation": generation,
+        "initial_file": project_structure[0]["files"][0]["path"] if project_structure and project_structure[0]["files"] else None
     })
 
+async def _generation_status(repo_id: str):
+    """Состояние незавершенной генерации документации репозитория или None, если она закончена"""
+    job_id = await redis_service.get_key(f"repo:{repo_id}:job")
+    job = await job_queue.get(str(job_id)) if job_id else None
+    if job is None or job["status"] == "done":
+        return None
+    return {"status": job["status"], "completed": job["completed"], "total": job["total"]}
+
 @router.get("/content/{user_id}/{repo_id}/{file_path:path}")
 async def get_documentation_content(user_id: str, repo_id: str, file_path: str):
     content_path = Path(f"storage/docs/{user_id}/{repo_id}/{file_path}")
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status, Header
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.services.github_service import GitHubAuthService, get_github_auth_service
+from src.services.github_service import GitHubAuthService, GitHubWebhookService, get_github_auth_service
+from src.services.repo_service import RepositoryService
 from src.services.auth_handler import decode_token
-from src.models.main_model import GitHubAuth
+from src.models.main_model import GitHubAuth, Repository
 from fastapi.templating import Jinja2Templates
 from src.database import get_session
+from config.config_app import Config
 from sqlalchemy import select
-import uuid
+import uuid, hmac, hashlib, json
 
 router = APIRouter()
 
@@ -115,3 +117,57 @@ async def github_status(
     except HTTPException:
         return {"linked": True, "details": "Could not fetch current user info"}
     
+
+@router.post("/webhook")
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(None),
+    x_hub_signature_256: str = Header(None),
+    session: AsyncSession = Depends(get_session)
+):
+    """Принимает события GitHub: push в ветку по умолчанию ставит в очередь обновление документации"""
+    if not Config.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Webhook secret is not configured"
+        )
+    body = await request.body()
+    expected = "sha256=" + hmac.new(Config.GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    if not x_hub_signature_256 or not hmac.compare_digest(expected, x_hub_signature_256):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook signature"
+        )
+    
+    payload = json.loads(body)
+    if x_github_event != "push":
+        return {"status": "ignored", "event_type": x_github_event}
+    
+    # Ссылка хранится в том виде, в каком ее ввел пользователь
+    html_url = payload["repository"]["html_url"]
+    result = await session.execute(
+        select(Repository).where(
+            Repository.ssh_url.in_([html_url, f"{html_url}.git", payload["repository"]["clone_url"]]),
+            Repository.webhook_configured == True
+        )
+    )
+    
+    jobs = []
+    for repo in result.scalars().all():
+        auth = await session.execute(select(GitHubAuth).where(GitHubAuth.user_id == repo.user_id))
+        github_auth = auth.scalars().first()
+        if not github_auth:
+            continue
+        
+        event = await GitHubWebhookService(github_auth.access_token).handle_webhook_event({
+            "headers": {"X-GitHub-Event": x_github_event},
+            "body": payload
+        })
+        if event.get("action") != "update_docs" or not event["modified_files"]:
+            continue
+        
+        job_id = await RepositoryService(session, github_auth.access_token).enqueue_update(repo, event["modified_files"])
+        if job_id:
+            jobs.append(job_id)
+    
+    return {"status": "queued" if jobs else "ignored", "jobs": jobs}
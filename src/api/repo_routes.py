@@ -3,12 +3,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.templating import Jinja2Templates
 from src.services.auth_handler import decode_token
 from src.services.repo_service import RepositoryService, ENCRYPTED_DIR_ROOT
+from src.services.job_queue import job_queue
 from src.database import get_session
 from src.models.main_model import GitHubAuth
 from src.redis import redis_service
 from sqlalchemy import select
 from src.schemas.repo_schema import RepoAnalysisRequest
-import uuid, tempfile, os, shutil, zipfile, asyncio
+from src.utils.archive_ingest import ARCHIVE_SUFFIXES
+import uuid
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
@@ -54,7 +56,7 @@ async def import_repository(
     authorization: str = Header(None),
     db: AsyncSession = Depends(get_session)
 ):
-    """Импортирует репозиторий из ZIP архива"""
+    """Импортирует репозиторий из ZIP или TAR архива"""
     
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -65,48 +67,15 @@ async def import_repository(
     try:
         user_id = await _get_authenticated_user(authorization)
         
-        if not repoFile.filename.lower().endswith(('.zip', '.rar', '.7z')):
+        if not repoFile.filename.lower().endswith(ARCHIVE_SUFFIXES):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Поддерживаются только ZIP, RAR и 7ZIP архивы"
-            )
-        
-        temp_dir = tempfile.mkdtemp(prefix="repo_zip_")
-        zip_path = os.path.join(temp_dir, repoFile.filename)
-        
-        with open(zip_path, "wb") as f:
-            content = await repoFile.read()
-            f.write(content)
-        
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-        except zipfile.BadZipFile:
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Некорректный ZIP архив"
+                detail="Поддерживаются только ZIP и TAR (gz, bz2, xz) архивы"
             )
         
+        # Загрузка уже лежит во временном файле Starlette: архив читается из него по записям, без копии в памяти
         service = RepositoryService(db, None) 
-        repo_id = uuid.uuid4()
-        
-        asyncio.create_task(
-            service._process_repository_background(
-                repo_id, 
-                temp_dir, 
-                f"ZIP Archive: {repoFile.filename}", 
-                user_id, 
-                {"name": repoFile.filename}
-            )
-        )
-        
-        return {
-            "status": "processing",
-            "message": "Генерация документации начата",
-            "repo_id": str(repo_id),
-            "user_id": str(user_id)
-        }
+        return await service.import_archive(repoFile.file, repoFile.filename, user_id)
         
     except HTTPException:
         raise
@@ -116,6 +85,26 @@ async def import_repository(
             detail=f"Ошибка обработки архива: {str(e)}"
         )
 
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, authorization: str = Header(None)):
+    """Состояние задачи обработки репозитория в очереди"""
+    user_id = await _get_authenticated_user(authorization)
+    job = await job_queue.get(job_id)
+    
+    if not job or job["user_id"] != str(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return {
+        "job_id": job["id"],
+        "repo_id": job["payload"]["repo_id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "error": job["error"]
+    }
+
 @router.post("/cache-url")
 async def cache_repo_url(
     request: RepoAnalysisRequest,
@@ -0,0 +1,72 @@
+import os
+
+import httpx
+import openai
+
+from config.config_app import Config
+
+
+class HTTPClients:
+    """Общие HTTP-клиенты процесса (GitHub API и модель) с пулом keep-alive соединений и HTTP/2.
+
+    В приложении создаются при старте и закрываются при остановке. В процессах воркеров
+    клиенты создаются лениво при первом обращении, у каждого процесса свои: после fork
+    соединения родителя не переиспользуются.
+    """
+
+    def __init__(self):
+        self._pid = None
+        self._github = None
+        self._llm = None
+
+    def _check_process(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._github = None
+            self._llm = None
+
+    def _http_client(self, timeout: float, max_connections: int) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=Config.HTTP_KEEPALIVE_SECONDS
+            )
+        )
+
+    @property
+    def github(self) -> httpx.AsyncClient:
+        self._check_process()
+        if self._github is None or self._github.is_closed:
+            self._github = self._http_client(30.0, Config.GITHUB_MAX_CONNECTIONS)
+        return self._github
+
+    @property
+    def llm(self) -> openai.AsyncOpenAI:
+        self._check_process()
+        if self._llm is None or self._llm.is_closed():
+            # Повторы делает движок генерации с учетом лимитов, встроенные повторы клиента отключены
+            self._llm = openai.AsyncOpenAI(
+                api_key=os.getenv("TOKEN_OPENAI_API"),
+                base_url="https://api.proxyapi.ru/deepseek",
+                max_retries=0,
+                http_client=self._http_client(Config.LLM_TIMEOUT_SECONDS, Config.LLM_MAX_CONCURRENCY)
+            )
+        return self._llm
+
+    async def startup(self):
+        self.github
+        self.llm
+
+    async def shutdown(self):
+        if self._github is not None:
+            await self._github.aclose()
+        if self._llm is not None:
+            await self._llm.close()
+        self._github = None
+        self._llm = None
+
+
+http_clients = HTTPClients()
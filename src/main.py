@@ -1,4 +1,5 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -11,12 +12,20 @@ from src.api.github_routes import router as github_router
 from src.api.repo_routes import router as repo_router
 from src.api.docs_routes import router as docs_router
 from src.api.profile_routes import router as profile_router
+from src.http_clients import http_clients
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    await http_clients.startup()
+    yield
+    await http_clients.shutdown()
 
 def get_application() -> FastAPI:
     application = FastAPI(
         title='FastApi & AI Application',
         debug=True,
-        version='beta 0.01'
+        version='beta 0.01',
+        lifespan=lifespan
     )
     application.include_router(main_router, tags=['main'])
     application.include_router(auth_router, prefix="/auth", tags=["auth"])
@@ -26,6 +26,11 @@ class RedisService:
             value = json.dumps(value)
         self.redis.set(key, value, ex=expire)
 
+    async def set_key_if_absent(self, key: str, value, expire: int = None) -> bool:
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        return bool(self.redis.set(key, value, ex=expire, nx=True))
+
     async def get_key(self, key: str):
         value = self.redis.get(key)
         if value is None:
@@ -1,40 +1,141 @@
-from typing import List, Dict
+from typing import Awaitable, Callable, List, Dict, Optional
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-import openai, json, os, asyncio, textwrap
+import json, os, re, asyncio, textwrap
+from config.config_app import Config
+from src.utils.doc_cache import DocCache
+from src.services.generation_engine import GenerationEngine
+from src.utils.code_chunker import split_code
+from src.utils.tokenizer import count_tokens
 
-MAX_TOKENS_PER_CHUNK = 3000
+# Нижняя граница фрагмента, если промт с зависимостями и структурой занял почти весь контекст
+MIN_CHUNK_TOKENS = 500
+# Версия шаблона промта: повышается при любом его изменении, чтобы кэш не отдавал документацию по старому промту
+PROMPT_VERSION = "2"
+
+# Статические инструкции: отправляются один раз системным сообщением, фрагменты кода идут отдельно
+SYSTEM_PROMPT = textwrap.dedent("""
+    Ты — технический писатель и аналитик, который разрабатывает документацию к коду. Ты структурируешь и пишешь четкую документацию с использованием Markdown и Readme.md.
+    В каждом сообщении пользователя - название файла, его место в проекте, зависимости, структура файла и код (весь файл или его фрагмент).
+
+    Тебе требуется сгенерировать подробный и понятную, исчерпывающую профессиональную документацию для кода. 
+    В документации (документация должна составляться сверху вниз в соотвествие с кодом) должно содержаться следующее,
+    1. Название класса и его описание
+    2. Методы и функции которые содержит класс
+    3. Описание каждой функции, для какой цели она используется (как ты думаешь)
+    4. Должно быть для каждой функции входные параметры
+    5. Также должно быть, что может вывести функция
+
+    Прошу именно с такой структурой которой я тебе описал, разработать документацию в соответствии ВСЕГО КОДА ИЗ СООБЩЕНИЯ ПОЛЬЗОВАТЕЛЯ
+
+    **Стиль написания**:
+        - Используй профессиональный, но понятный язык
+        - Для каждого метода укажи его сложность (O-нотация)
+        - Технические термины выделяй `backticks`
+        - Код оформляй в блоки ``` с указанием языка
+        - Списки и подсписки для пошаговых объяснений
+        - Важные предупреждения выделяй **Внимание:** или ⚠️
+        - Возможные проблемы при настройке выделяй **Осторожно* или ❗️
+        - Не должно быть лишней информации (пример: Вот профессиональная документация для предоставленного кода:, Эта документация:, Path 1) ИХ НЕ ДОЛЖНО БЫТЬ
+        - Добавляй документацию к библиотекам которые есть проекте в конец сообщения (если есть alembic ты приклепляешь документацию к alembic, только не забудь про язые програмирования чтоыб правильно указать)
+        - Вся документация должна быть на русском. При создание документации НЕ НАДО ОБОРАЧИВАТЬ ее в ```markdown ```
+        - в начале документации должно добавляться кликабельное содержание для передвижения по документации
+""").strip()
+
+# Разделитель документации файлов в ответе на пакетный запрос
+BATCH_DOC_DELIMITER = "<<<DOC {path}>>>"
+BATCH_DOC_PATTERN = re.compile(r'^[ \t`]*<<<DOC\s+(.+?)>>>[ \t`]*$', re.MULTILINE)
+
+def part_header(index: int) -> str:
+    return f"\n\n## Part {index + 1}\n"
+
+async def gather_or_cancel(*coroutines: Awaitable) -> List:
+    """asyncio.gather, который при первой ошибке отменяет остальные запросы: результат без упавшей
+    части не нужен, а незавершенные запросы продолжали бы писать в поток и тратить лимиты модели"""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+class OrderedPartsStream:
+    """Сводит параллельные потоки частей файла в один поток в порядке частей:
+    текст части, до которой очередь еще не дошла, копится в буфере"""
+
+    def __init__(self, count: int, on_text: Callable[[str], Awaitable[None]]):
+        self.count = count
+        self.on_text = on_text
+        self.current = 0
+        self.opened = -1
+        self.buffers: Dict[int, List[str]] = {}
+        self.finished = set()
+        self.lock = asyncio.Lock()
+
+    async def _open(self):
+        # Заголовок части выводится вместе с ее первым текстом
+        if self.opened < self.current:
+            self.opened = self.current
+            await self.on_text(part_header(self.current))
+
+    async def feed(self, index: int, text: str):
+        async with self.lock:
+            if index == self.current:
+                await self._open()
+                await self.on_text(text)
+            else:
+                self.buffers.setdefault(index, []).append(text)
+
+    async def finish(self, index: int):
+        async with self.lock:
+            self.finished.add(index)
+            while self.current in self.finished:
+                await self._open()
+                if self.current + 1 == self.count:
+                    break
+                self.current += 1
+                buffered = self.buffers.pop(self.current, [])
+                if buffered:
+                    await self._open()
+                    for text in buffered:
+                        await self.on_text(text)
 
 class AIService:
-    def __init__(self):
+    def __init__(self, engine: Optional[GenerationEngine] = None):
+        self.engine = engine
         self.logs_dir = Path("ai_logs")
         self.corrections_file = Path("ai_corrections.jsonl")
         self.docs_version = "2.0"
         self.model = "deepseek-chat"
         os.makedirs(self.logs_dir, exist_ok=True)
+        self.cache = DocCache.shared(Config.DOC_CACHE_PATH, Config.DOC_CACHE_MAX_BYTES, Config.DOC_CACHE_MAX_AGE_SECONDS)
         load_dotenv()
         
-    def split_code_by_tokens(self, content: str, max_tokens: int = MAX_TOKENS_PER_CHUNK) -> List[str]:
-        lines = content.splitlines()
-        chunks = []
-        current_chunk = []
-        current_length = 0
-
-        for line in lines:
-            line_len = len(line.split())
-            if current_length + line_len > max_tokens:
-                chunks.append("\n".join(current_chunk))
-                current_chunk = [line]
-                current_length = line_len
-            else:
-                current_chunk.append(line)
-                current_length += line_len
+    def split_code_by_tokens(
+        self,
+        content: str,
+        file_path: str,
+        dependencies: List[str],
+        outline: str = "",
+        structure: Optional[Dict] = None,
+    ) -> List[str]:
+        """Режет код по границам определений так, чтобы промт с фрагментом и ответ поместились в контекст модели"""
+        return split_code(content, self._chunk_budget(file_path, dependencies, outline), structure)
 
-        if current_chunk:
-            chunks.append("\n".join(current_chunk))
+    def needs_split(self, content: str, file_path: str, dependencies: List[str]) -> bool:
+        """Не помещается ли файл в один запрос: только таким файлам нужна структура файла"""
+        return count_tokens(content) > self._chunk_budget(file_path, dependencies)
 
-        return chunks
+    def _chunk_budget(self, file_path: str, dependencies: List[str], outline: str = "") -> int:
+        prompt_tokens = sum(count_tokens(message["content"]) for message in self.build_messages(file_path, "", dependencies, outline))
+        budget = min(
+            Config.LLM_CHUNK_TOKENS,
+            Config.LLM_CONTEXT_TOKENS - prompt_tokens - Config.LLM_OUTPUT_TOKENS_ESTIMATE
+        )
+        return max(budget, MIN_CHUNK_TOKENS)
 
     def build_prompt(
         self,
@@ -42,85 +143,181 @@ class AIService:
         file_path: str,
         content: str,
         dependencies: List[str],
+        outline: str = "",
     ) -> str:
-        """Строит промт для генерации документации с учетом старой версии (если есть)"""
+        """Строит сообщение пользователя для фрагмента: только код и сведения о файле, инструкции - в SYSTEM_PROMPT"""
         
-        prompt = f"""
-            Ты — технический писатель и аналитик. Ниже представлен код проекта.
-
-            Вот код проекта:
-            {content}
-            
-            Тебе требуется сгенерировать подробный и понятную, исчерпывающую профессиональную документацию для кода. 
-            В документации (документация должна составляться сверху вниз в соотвествие с кодом) должно содержаться следующее,
-            1. Название класса и его описание
-            2. Методы и функции которые содержит класс
-            3. Описание каждой функции, для какой цели она используется (как ты думаешь)
-            4. Должно быть для каждой функции входные параметры
-            5. Также должно быть, что может вывести функция
-            
-            Прошу именно с такой структурой которой я тебе описал, разработать документацию в соответствии ВСЕГО КОДА КОТОРЫЙ БУДЕТ НИЖЕ
-            
-            **Стиль написания**:
-                - Используй профессиональный, но понятный язык
-                - Для каждого метода укажи его сложность (O-нотация)
-                - Технические термины выделяй `backticks`
-                - Код оформляй в блоки ``` с указанием языка
-                - Списки и подсписки для пошаговых объяснений
-                - Важные предупреждения выделяй **Внимание:** или ⚠️
-                - Возможные проблемы при настройке выделяй **Осторожно* или ❗️
-                - Не должно быть лишней информации (пример: Вот профессиональная документация для предоставленного кода:, Эта документация:, Path 1) ИХ НЕ ДОЛЖНО БЫТЬ
-                - Добавляй документацию к библиотекам которые есть проекте в конец сообщения (если есть alembic ты приклепляешь документацию к alembic, только не забудь про язые програмирования чтоыб правильно указать)
-                - Вся документация должна быть на русском. При создание документации НЕ НАДО ОБОРАЧИВАТЬ ее в ```markdown ```
-                - в начале документации должно добавляться кликабельное содержание для передвижения по документации
-                
-            Вот тебе название файла: {file_name}
-            Зависимости внутри файла: {', '.join(dependencies)}
-            И последнее его место нахождение в проекте: {file_path}
-        """
+        prompt = [
+            f"Название файла: {file_name}",
+            f"Место нахождения в проекте: {file_path}",
+            f"Зависимости внутри файла: {', '.join(dependencies)}",
+        ]
+        if outline:
+            prompt.append(f"Структура всего файла (классы, сигнатуры, docstring, строки):\n{outline}")
+        prompt.append(f"Код:\n{content}")
 
-        return "\n".join(prompt)
+        return "\n\n".join(prompt)
+
+    def build_messages(
+        self,
+        file_path: str,
+        content: str,
+        dependencies: List[str],
+        outline: str = "",
+    ) -> List[Dict[str, str]]:
+        # Системное сообщение одинаково во всех запросах: провайдер кэширует этот префикс
+        return [
+            {'role': 'system', 'content': SYSTEM_PROMPT},
+            {'role': 'user', 'content': self.build_prompt(os.path.basename(file_path), file_path, content, dependencies, outline)}
+        ]
     
-    def generate_documentation_sync(self, content: str, file_path: str, dependencies: List[str]) -> str:
-        """Синхронная обертка для вызова async generate_documentation (для использования в ProcessPoolExecutor)"""
-        return asyncio.run(self.generate_documentation(content, file_path, dependencies))
+    def build_batch_messages(self, items: List[Dict]) -> List[Dict[str, str]]:
+        """Один запрос на несколько мелких файлов: каждый файл описан как в обычном промте, ответ делится разделителями"""
+        sections = [
+            f"Ниже {len(items)} файлов из одной группы зависимостей. Составь документацию для каждого файла отдельно, "
+            f"по тем же правилам. Перед документацией каждого файла выведи на отдельной строке разделитель "
+            f"{BATCH_DOC_DELIMITER.format(path='путь/к/файлу')} с путем файла из его описания и больше ничего в этой строке."
+        ]
+        for item in items:
+            sections.append(f"===== Файл {item['path']} =====\n" + self.build_prompt(
+                os.path.basename(item["path"]), item["path"], item["content"], item["dependencies"]
+            ))
+        return [
+            {'role': 'system', 'content': SYSTEM_PROMPT},
+            {'role': 'user', 'content': "\n\n".join(sections)}
+        ]
+
+    def split_batch_response(self, response: str, paths: List[str]) -> Dict[str, str]:
+        """Делит ответ на пакетный запрос по разделителям; файлы, которых нет в ответе, не попадают в результат"""
+        docs = {}
+        matches = list(BATCH_DOC_PATTERN.finditer(response))
+        for i, match in enumerate(matches):
+            path = match.group(1).strip()
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+            text = response[match.end():end].strip()
+            # Модель иногда оборачивает разделитель в ``` - непарные ограды по краям раздела относятся к нему
+            if text.count("```") % 2 and text.endswith("```"):
+                text = text[:-3].rstrip()
+            if text.count("```") % 2 and text.startswith("```"):
+                text = text[3:].lstrip()
+            if path in paths and text:
+                docs[path] = text
+        return docs
+
+    async def generate_batch_documentation(self, items: List[Dict]) -> Dict[str, str]:
+        """Документация нескольких мелких файлов одним запросом.
+
+        `items` - словари path, content, dependencies (мелкие файлы отправляются целиком, без структуры). Каждый файл кэшируется под тем же ключом,
+        что и при одиночной генерации; файлы, пропущенные моделью, генерируются по одному.
+        """
+        engine = self.engine or GenerationEngine.shared()
+        docs = {}
+        pending = []
+        for item in items:
+            self._log_processing_start(item["path"])
+            item["cache_key"] = self.cache.make_key(item["content"], PROMPT_VERSION, self.model, item["dependencies"])
+            cached = await asyncio.to_thread(self.cache.get, item["cache_key"])
+            if cached is not None:
+                docs[item["path"]] = cached
+            else:
+                pending.append(item)
+
+        if len(pending) > 1:
+            response, usage = await engine.complete(self.model, self.build_batch_messages(pending))
+            self._log_request(", ".join(item["path"] for item in pending), usage)
+            split = self.split_batch_response(response, [item["path"] for item in pending])
+            for item in pending:
+                if item["path"] in split:
+                    docs[item["path"]] = split[item["path"]]
+                    await asyncio.to_thread(self.cache.put, item["cache_key"], split[item["path"]])
+            pending = [item for item in pending if item["path"] not in split]
+
+        parts = await gather_or_cancel(*(
+            self._document_chunk(engine, item["content"], item["path"], item["dependencies"], "")
+            for item in pending
+        ))
+        docs.update({item["path"]: part for item, part in zip(pending, parts)})
+
+        results = {}
+        for item in items:
+            results[item["path"]] = part_header(0) + docs[item["path"]]
+            self._log_processing_end(item["path"], results[item["path"]])
+        return results
 
     async def generate_documentation(
         self,
         content: str,
         file_path: str,
         dependencies: List[str],
+        outline: str = "",
+        structure: Optional[Dict] = None,
+        on_text: Optional[Callable[[str], Awaitable[None]]] = None,
     ) -> str:
-        """Генерирует документацию с возможностью обновления существующей"""
+        """Генерирует документацию с возможностью обновления существующей; части файла запрашиваются параллельно.
+
+        С `on_text` ответы модели идут потоком: текст документа по порядку передается в `on_text` по мере генерации.
+        """
         self._log_processing_start(file_path)
         
-        chunks = self.split_code_by_tokens(content)
-        client = openai.OpenAI(
-            api_key=os.getenv("TOKEN_OPENAI_API"),
-            base_url="https://api.proxyapi.ru/deepseek"
-        )
-
-        full_result = ""
-        for i, chunk in enumerate(chunks):
-            prompt = self.build_prompt(
-                os.path.basename(file_path),
-                file_path,
-                chunk,
-                dependencies
-            )
-
-            completion = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {'role': 'system', 'content': 'Ты являешься специалистом, который разрабатывает документацию к коду. Ты структурируешь и пишешь четкую документацию с использованием Markdown и Readme.md.'},
-                    {'role': 'user', 'content': prompt}
-                ]
-            )
-            full_result += f"\n\n## Part {i + 1}\n" + completion.choices[0].message.content.strip()
+        # Без переданного движка берется общий движок процесса с его лимитами
+        engine = self.engine or GenerationEngine.shared()
+        # Структура нужна только фрагментам: файл, который помещается в один запрос, модель видит целиком
+        chunks = self.split_code_by_tokens(content, file_path, dependencies, "", structure)
+        if len(chunks) > 1 and outline:
+            chunks = self.split_code_by_tokens(content, file_path, dependencies, outline, structure)
+        else:
+            outline = ""
+        stream = OrderedPartsStream(len(chunks), on_text) if on_text is not None else None
+        parts = await gather_or_cancel(*(
+            self._document_chunk(engine, chunk, file_path, dependencies, outline, stream, i)
+            for i, chunk in enumerate(chunks)
+        ))
 
+        full_result = "".join(part_header(i) + part for i, part in enumerate(parts))
         self._log_processing_end(file_path, full_result)
         return full_result
 
+    async def _document_chunk(
+        self,
+        engine: GenerationEngine,
+        chunk: str,
+        file_path: str,
+        dependencies: List[str],
+        outline: str,
+        stream: Optional[OrderedPartsStream] = None,
+        index: int = 0,
+    ) -> str:
+        cache_key = self.cache.make_key(chunk, PROMPT_VERSION, self.model, dependencies, outline)
+        cached = await asyncio.to_thread(self.cache.get, cache_key)
+        if cached is not None:
+            if stream is not None:
+                await stream.feed(index, cached)
+                await stream.finish(index)
+            return cached
+
+        messages = self.build_messages(file_path, chunk, dependencies, outline)
+        if stream is None:
+            part, usage = await engine.complete(self.model, messages)
+        else:
+            started = False
+
+            async def on_delta(delta: str):
+                # Пробелы в начале ответа отбрасываются, как и при обычном запросе
+                nonlocal started
+                if not started:
+                    delta = delta.lstrip()
+                    started = bool(delta)
+                if delta:
+                    await stream.feed(index, delta)
+
+            part, usage = await engine.stream(self.model, messages, on_delta)
+
+        self._log_request(file_path, usage)
+        await asyncio.to_thread(self.cache.put, cache_key, part)
+        if stream is not None:
+            await stream.finish(index)
+        return part
+
     def _log_processing_start(self, file_path: str):
         self._write_log({
             "timestamp": datetime.utcnow().isoformat(),
@@ -133,7 +330,19 @@ class AIService:
             "timestamp": datetime.utcnow().isoformat(),
             "action": "end_processing",
             "file": file_path,
-            "result_length": len(result)
+            "result_length": len(result),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses
+        })
+
+    def _log_request(self, file_path: str, usage: Dict[str, int]):
+        """Расход токенов одного запроса: по этим записям сравнивается стоимость промтов"""
+        self._write_log({
+            "timestamp": datetime.utcnow().isoformat(),
+            "action": "llm_request",
+            "file": file_path,
+            "prompt_version": PROMPT_VERSION,
+            **usage
         })
 
     def _write_log(self, entry: Dict):
@@ -0,0 +1,244 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio, os, random, time
+
+import openai
+
+from config.config_app import Config
+from src.http_clients import http_clients
+from src.redis import redis_service
+from src.utils.tokenizer import count_tokens
+
+# Ведро в Redis: пополнение и списание атомарно и по часам Redis, чтобы процессы на разных машинах
+# делили один лимит. ARGV: емкость, пополнение в секунду, количество, режим (take - взять или вернуть
+# время ожидания, adjust - поправка после ответа). Возвращает секунды ожидания строкой (дробные)
+REDIS_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or capacity)
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated') or now)
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if ARGV[4] == 'take' then
+    if tokens >= amount then
+        tokens = tokens - amount
+    else
+        wait = (amount - tokens) / rate
+    end
+else
+    tokens = math.min(capacity, tokens - amount)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(wait)
+"""
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(message["content"]) for message in messages)
+
+
+class TokenBucket:
+    """Ведро токенов: не больше `per_minute` единиц в минуту с равномерным пополнением"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: int):
+        # Запрос больше емкости ведра ждет полного ведра, иначе он не прошел бы никогда
+        amount = min(float(amount), self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: int):
+        """Поправка после ответа: фактический расход мог отличаться от оценки (долг уходит в минус)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RedisTokenBucket:
+    """То же ведро, но общее для всех процессов и машин: состояние лежит в Redis"""
+
+    def __init__(self, redis_client, key: str, per_minute: int):
+        self.key = key
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._script = redis_client.register_script(REDIS_BUCKET_SCRIPT)
+        self.lock = asyncio.Lock()
+
+    def _call(self, amount: float, mode: str) -> float:
+        return float(self._script(keys=[self.key], args=[self.capacity, self.rate, amount, mode]))
+
+    async def acquire(self, amount: int):
+        amount = min(float(amount), self.capacity)
+        # Внутри процесса запросы ждут по очереди, как у локального ведра
+        async with self.lock:
+            while True:
+                wait = self._call(amount, "take")
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def adjust(self, amount: int):
+        self._call(amount, "adjust")
+
+
+_shared_engine: Optional["GenerationEngine"] = None
+_shared_owner: Optional[Tuple[int, asyncio.AbstractEventLoop]] = None
+
+
+class GenerationEngine:
+    """Асинхронные запросы к модели из одного event loop: ограничение параллелизма,
+    лимиты запросов и токенов в минуту, повтор с джиттером на 429 и 5xx"""
+
+    RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+    def __init__(
+        self,
+        client: openai.AsyncOpenAI,
+        max_concurrency: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_retries: int,
+        owns_client: bool = True,
+        shared_limits: bool = False
+    ):
+        """`shared_limits` - лимиты запросов и токенов в минуту общие для всех процессов (в Redis)"""
+        self.client = client
+        self.owns_client = owns_client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        if shared_limits:
+            self.requests = RedisTokenBucket(redis_service.redis, "llm:limit:requests", requests_per_minute)
+            self.tokens = RedisTokenBucket(redis_service.redis, "llm:limit:tokens", tokens_per_minute)
+        else:
+            self.requests = TokenBucket(requests_per_minute)
+            self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+
+    @classmethod
+    def from_config(cls) -> "GenerationEngine":
+        """Движок поверх общего клиента процесса: соединения с API переживают отдельные генерации"""
+        return cls(
+            http_clients.llm,
+            Config.LLM_MAX_CONCURRENCY,
+            Config.LLM_REQUESTS_PER_MINUTE,
+            Config.LLM_TOKENS_PER_MINUTE,
+            Config.LLM_MAX_RETRIES,
+            owns_client=False,
+            shared_limits=Config.LLM_SHARED_LIMITS
+        )
+
+    @classmethod
+    def shared(cls) -> "GenerationEngine":
+        """Один движок на процесс (и его event loop): все задачи воркера делят семафор и лимиты,
+        а не получают каждая свои"""
+        global _shared_engine, _shared_owner
+        owner = (os.getpid(), asyncio.get_running_loop())
+        if _shared_engine is None or _shared_owner != owner:
+            _shared_engine = cls.from_config()
+            _shared_owner = owner
+        return _shared_engine
+
+    async def complete(self, model: str, messages: List[Dict[str, str]]) -> Tuple[str, Dict[str, int]]:
+        """Ответ модели и расход токенов запроса (оценка до отправки и фактический usage)"""
+        estimated = estimate_tokens(messages) + Config.LLM_OUTPUT_TOKENS_ESTIMATE
+
+        for attempt in range(self.max_retries + 1):
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated)
+            try:
+                async with self.semaphore:
+                    completion = await self.client.chat.completions.create(model=model, messages=messages)
+            except self.RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"[!] LLM request failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            return completion.choices[0].message.content.strip(), self._usage(completion.usage, estimated)
+
+    async def stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        on_delta: Callable[[str], Awaitable[None]]
+    ) -> Tuple[str, Dict[str, int]]:
+        """То же, что complete, но текст ответа передается в `on_delta` по мере генерации.
+        Повтор возможен только до первой части ответа: отданный текст уже не забрать"""
+        estimated = estimate_tokens(messages) + Config.LLM_OUTPUT_TOKENS_ESTIMATE
+
+        for attempt in range(self.max_retries + 1):
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated)
+            received: List[str] = []
+            completion_usage = None
+            try:
+                async with self.semaphore:
+                    response = await self.client.chat.completions.create(
+                        model=model, messages=messages, stream=True, stream_options={"include_usage": True}
+                    )
+                    async for chunk in response:
+                        if chunk.usage is not None:
+                            completion_usage = chunk.usage
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            received.append(chunk.choices[0].delta.content)
+                            await on_delta(chunk.choices[0].delta.content)
+            except self.RETRYABLE_ERRORS as e:
+                if received or attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"[!] LLM stream failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            return "".join(received).strip(), self._usage(completion_usage, estimated)
+
+    def _usage(self, completion_usage, estimated: int) -> Dict[str, int]:
+        usage = {"estimated_tokens": estimated}
+        if completion_usage is None:
+            return usage
+
+        self.tokens.adjust(completion_usage.total_tokens - estimated)
+        usage["prompt_tokens"] = completion_usage.prompt_tokens
+        usage["completion_tokens"] = completion_usage.completion_tokens
+        # Попадания в кэш префикса: deepseek отдает prompt_cache_hit_tokens, OpenAI - prompt_tokens_details
+        cached = getattr(completion_usage, "prompt_cache_hit_tokens", None)
+        details = getattr(completion_usage, "prompt_tokens_details", None)
+        if cached is None and details is not None:
+            cached = getattr(details, "cached_tokens", None)
+        if cached is not None:
+            usage["cached_prompt_tokens"] = cached
+        return usage
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Retry-After от сервера, если он есть, иначе экспоненциальная задержка с полным джиттером"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, 1)
+            except ValueError:
+                pass
+        return random.uniform(0, min(60.0, 2.0 ** attempt))
+
+    async def close(self):
+        if self.owns_client:
+            await self.client.close()
@@ -0,0 +1,147 @@
+from typing import Dict, Iterable, List, Optional, Set
+import asyncio, os, random, time
+
+import httpx
+
+from src.utils.archive_ingest import is_wanted
+from src.utils.repo_walker import MAX_FILE_BYTES
+
+# Режимы записей дерева, которые не являются обычными файлами: ссылки и подмодули
+SKIPPED_MODES = {'120000', '160000'}
+
+
+class GitHubRateLimit:
+    """Общая для всех запросов пауза по лимитам GitHub: при исчерпанном x-ratelimit-remaining
+    или ответе с retry-after новые запросы ждут, а не тратят попытки впустую"""
+
+    def __init__(self):
+        self.resume_at = 0.0
+
+    async def wait(self):
+        delay = self.resume_at - time.time()
+        if delay > 0:
+            print(f"[*] GitHub rate limit reached, waiting {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    def update(self, response: httpx.Response) -> bool:
+        """Запоминает лимиты из ответа. True - запрос отклонен лимитом и его нужно повторить"""
+        headers = response.headers
+        limited = response.status_code == 429 or (response.status_code == 403 and (
+            headers.get("retry-after") or headers.get("x-ratelimit-remaining") == "0"
+        ))
+
+        if headers.get("retry-after"):
+            try:
+                self.resume_at = max(self.resume_at, time.time() + float(headers["retry-after"]))
+            except ValueError:
+                pass
+        elif headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+            self.resume_at = max(self.resume_at, float(headers["x-ratelimit-reset"]) + random.uniform(0, 1))
+        elif limited:
+            # Вторичный лимит без заголовков: GitHub советует подождать хотя бы минуту
+            self.resume_at = max(self.resume_at, time.time() + 60)
+        return limited
+
+
+class GitHubTreeDownloader:
+    """Скачивание ревизии через API без git: дерево целиком одним запросом `git/trees?recursive=1`,
+    блобы параллельно (не больше `concurrency` запросов), запись на диск в потоках, а не в event loop"""
+
+    def __init__(self, client: httpx.AsyncClient, api_base: str, headers: Dict[str, str], concurrency: int, max_retries: int = 5):
+        self.client = client
+        self.api_base = api_base.rstrip("/")
+        self.headers = headers
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limit = GitHubRateLimit()
+        self.max_retries = max_retries
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict] = None) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.semaphore:
+                    # Ожидание внутри семафора: на паузе лимита не стартует ни один запрос из очереди
+                    await self.rate_limit.wait()
+                    response = await self.client.get(url, headers={**self.headers, **(headers or {})}, params=params)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(random.uniform(0, 2.0 ** attempt))
+                continue
+            if self.rate_limit.update(response):
+                continue
+            if response.status_code >= 500 and attempt < self.max_retries:
+                await asyncio.sleep(random.uniform(0, 2.0 ** attempt))
+                continue
+            break
+        if response.status_code != 200:
+            raise RuntimeError(f"GitHub API error {response.status_code} for {url}: {response.text[:200]}")
+        return response
+
+    async def list_files(self, owner: str, repo_name: str, ref: str = "HEAD") -> Dict[str, Dict]:
+        """Путь -> запись блоба (sha, size, mode) для всей ревизии"""
+        return await self._list_tree(owner, repo_name, ref, "")
+
+    async def _list_tree(self, owner: str, repo_name: str, tree: str, prefix: str) -> Dict[str, Dict]:
+        url = f"{self.api_base}/repos/{owner}/{repo_name}/git/trees/{tree}"
+        data = (await self._get(url, params={"recursive": "1"})).json()
+        if data.get("truncated"):
+            # Слишком большое дерево отдается не целиком: обходим его по уровням
+            data = (await self._get(url)).json()
+            subtrees = [item for item in data["tree"] if item["type"] == "tree"]
+            nested = await asyncio.gather(*(
+                self._list_tree(owner, repo_name, item["sha"], f"{prefix}{item['path']}/") for item in subtrees
+            ))
+        else:
+            nested = []
+
+        files = {
+            f"{prefix}{item['path']}": item
+            for item in data["tree"]
+            if item["type"] == "blob" and item["mode"] not in SKIPPED_MODES
+        }
+        for subtree_files in nested:
+            files.update(subtree_files)
+        return files
+
+    async def download(
+        self,
+        owner: str,
+        repo_name: str,
+        target_dir: str,
+        ref: str = "HEAD",
+        extensions: Optional[Iterable[str]] = None,
+        max_file_bytes: int = MAX_FILE_BYTES
+    ) -> List[str]:
+        """Скачивает файлы ревизии в `target_dir` и возвращает их пути. `extensions` - только файлы
+        с этими расширениями (плюс .gitignore и манифесты проектов)"""
+        allowed: Optional[Set[str]] = {ext.lower() for ext in extensions} if extensions is not None else None
+        target_root = os.path.realpath(target_dir)
+
+        by_sha: Dict[str, List[str]] = {}
+        for path, item in (await self.list_files(owner, repo_name, ref)).items():
+            if item.get("size", 0) > max_file_bytes or not is_wanted(path, allowed):
+                continue
+            abs_path = os.path.realpath(os.path.join(target_root, path))
+            if not abs_path.startswith(target_root + os.sep):
+                continue
+            # Одинаковое содержимое в нескольких файлах скачивается один раз
+            by_sha.setdefault(item["sha"], []).append(abs_path)
+
+        await asyncio.gather(*(
+            self._download_blob(owner, repo_name, sha, paths) for sha, paths in by_sha.items()
+        ))
+        return sorted(os.path.relpath(path, target_root) for paths in by_sha.values() for path in paths)
+
+    async def _download_blob(self, owner: str, repo_name: str, sha: str, paths: List[str]):
+        response = await self._get(
+            f"{self.api_base}/repos/{owner}/{repo_name}/git/blobs/{sha}",
+            headers={"Accept": "application/vnd.github.raw+json"}
+        )
+        await asyncio.to_thread(_write_files, paths, response.content)
+
+
+def _write_files(paths: List[str], content: bytes):
+    for path in paths:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
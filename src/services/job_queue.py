@@ -0,0 +1,209 @@
+from typing import Dict, Optional
+import json, time, uuid
+
+from config.config_app import Config
+from src.redis import redis_service
+
+QUEUE_KEY = "jobs:queue"
+RUNNING_KEY = "jobs:running"
+DELAYED_KEY = "jobs:delayed"
+RUNNING_BY_USER_KEY = "jobs:running_by_user"
+
+# Забирает самую старую задачу, владелец которой не упирается в лимит; задачи пользователей
+# на лимите уходят в конец очереди. Атомарно, чтобы воркеры не превышали лимиты вдвоем
+CLAIM_SCRIPT = """
+if redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[1]) then
+    return false
+end
+local scanned = math.min(redis.call('LLEN', KEYS[1]), tonumber(ARGV[5]))
+for i = 1, scanned do
+    local job_id = redis.call('RPOP', KEYS[1])
+    local key = 'job:' .. job_id
+    local user_id = redis.call('HGET', key, 'user_id')
+    if user_id then
+        if tonumber(redis.call('HGET', KEYS[3], user_id) or '0') < tonumber(ARGV[2]) then
+            redis.call('ZADD', KEYS[2], ARGV[3], job_id)
+            redis.call('HINCRBY', KEYS[3], user_id, 1)
+            redis.call('HINCRBY', key, 'attempts', 1)
+            redis.call('HSET', key, 'status', 'running', 'updated_at', ARGV[4])
+            return job_id
+        end
+        redis.call('LPUSH', KEYS[1], job_id)
+    end
+end
+return false
+"""
+
+# Снимает задачу с выполнения; счетчик пользователя уменьшается, только если задача еще числилась выполняемой
+RELEASE_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 1 then
+    local user_id = redis.call('HGET', 'job:' .. ARGV[1], 'user_id')
+    if user_id and redis.call('HINCRBY', KEYS[2], user_id, -1) <= 0 then
+        redis.call('HDEL', KEYS[2], user_id)
+    end
+    return 1
+end
+return 0
+"""
+
+# Сколько задач из начала очереди просматривается за одну попытку взять задачу
+CLAIM_SCAN_LIMIT = 100
+
+
+def job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def checkpoints_key(job_id: str) -> str:
+    return f"job:{job_id}:files"
+
+
+class JobQueue:
+    """Надежная очередь задач в Redis: задачи переживают перезапуск веб-сервера и воркеров.
+
+    Выполняемая задача держит аренду (`lease_seconds`), которую воркер продлевает. Если воркер умер,
+    аренда истекает и задача возвращается в очередь. Упавшая задача повторяется с задержкой,
+    пока не кончатся попытки.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        max_running: int,
+        max_running_per_user: int,
+        max_attempts: int,
+        lease_seconds: int,
+        retry_delay_seconds: int,
+        result_ttl_seconds: int
+    ):
+        self.redis = redis_client
+        self.max_running = max_running
+        self.max_running_per_user = max_running_per_user
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self._claim = redis_client.register_script(CLAIM_SCRIPT)
+        self._release = redis_client.register_script(RELEASE_SCRIPT)
+
+    async def enqueue(self, kind: str, user_id: uuid.UUID, payload: Dict) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.hset(job_key(job_id), mapping={
+            "id": job_id,
+            "kind": kind,
+            "user_id": str(user_id),
+            "payload": json.dumps(payload, ensure_ascii=False),
+            "status": "queued",
+            "attempts": 0,
+            "error": "",
+            "created_at": now,
+            "updated_at": now
+        })
+        pipe.lpush(QUEUE_KEY, job_id)
+        pipe.execute()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        data = self.redis.hgetall(job_key(job_id))
+        if not data:
+            return None
+        data["payload"] = json.loads(data["payload"])
+        data["attempts"] = int(data["attempts"])
+        for name in ("completed", "total"):
+            data[name] = int(data.get(name, 0))
+        return data
+
+    async def claim(self) -> Optional[Dict]:
+        """Берет следующую задачу в пределах общего лимита и лимита пользователя"""
+        now = time.time()
+        job_id = self._claim(
+            keys=[QUEUE_KEY, RUNNING_KEY, RUNNING_BY_USER_KEY],
+            args=[self.max_running, self.max_running_per_user, now + self.lease_seconds, now, CLAIM_SCAN_LIMIT]
+        )
+        if not job_id:
+            return None
+        return await self.get(job_id)
+
+    async def heartbeat(self, job_id: str):
+        # XX: аренду, которую уже забрал recover, продлевать нельзя
+        self.redis.zadd(RUNNING_KEY, {job_id: time.time() + self.lease_seconds}, xx=True)
+
+    async def complete(self, job_id: str):
+        self._release(keys=[RUNNING_KEY, RUNNING_BY_USER_KEY], args=[job_id])
+        self.redis.hset(job_key(job_id), mapping={"status": "done", "error": "", "updated_at": time.time()})
+        self._expire(job_id)
+
+    async def fail(self, job_id: str, error: str) -> bool:
+        """Отмечает неудачную попытку. True - задача будет повторена, False - попытки кончились"""
+        self._release(keys=[RUNNING_KEY, RUNNING_BY_USER_KEY], args=[job_id])
+        return await self._retry_or_fail(job_id, error)
+
+    async def _retry_or_fail(self, job_id: str, error: str) -> bool:
+        attempts = int(self.redis.hget(job_key(job_id), "attempts") or 0)
+        now = time.time()
+        if attempts < self.max_attempts:
+            self.redis.hset(job_key(job_id), mapping={"status": "retrying", "error": error, "updated_at": now})
+            self.redis.zadd(DELAYED_KEY, {job_id: now + self.retry_delay_seconds * 2 ** (attempts - 1)})
+            return True
+
+        self.redis.hset(job_key(job_id), mapping={"status": "failed", "error": error, "updated_at": now})
+        self._expire(job_id)
+        return False
+
+    def _expire(self, job_id: str):
+        self.redis.expire(job_key(job_id), self.result_ttl_seconds)
+        self.redis.expire(checkpoints_key(job_id), self.result_ttl_seconds)
+
+    async def set_progress(self, job_id: str, completed: int, total: int):
+        self.redis.hset(job_key(job_id), mapping={"completed": completed, "total": total})
+
+    async def checkpoints(self, job_id: str) -> Dict[str, Dict]:
+        """Файлы, готовые в прошлых попытках задачи: путь -> запись контрольной точки"""
+        return {path: json.loads(record) for path, record in self.redis.hgetall(checkpoints_key(job_id)).items()}
+
+    async def checkpoint(self, job_id: str, file_path: str, record: Dict):
+        self.redis.hset(checkpoints_key(job_id), file_path, json.dumps(record))
+
+    async def recover(self):
+        """Возвращает в очередь задачи с истекшей арендой (воркер умер) и задачи, дождавшиеся повтора"""
+        now = time.time()
+        for job_id in self.redis.zrangebyscore(RUNNING_KEY, "-inf", now):
+            if self._release(keys=[RUNNING_KEY, RUNNING_BY_USER_KEY], args=[job_id]):
+                print(f"[!] Job {job_id} lease expired")
+                await self._retry_or_fail(job_id, "Worker stopped before finishing the job")
+
+        for job_id in self.redis.zrangebyscore(DELAYED_KEY, "-inf", now):
+            # ZREM удаляет задачу только у одного из воркеров: она не попадет в очередь дважды
+            if self.redis.zrem(DELAYED_KEY, job_id):
+                await self._requeue(job_id, now)
+
+    async def _requeue(self, job_id: str, now: float):
+        self.redis.hset(job_key(job_id), mapping={"status": "queued", "updated_at": now})
+        self.redis.lpush(QUEUE_KEY, job_id)
+
+
+class JobCheckpoints:
+    """Контрольные точки генерации документации одной задачи: повтор задачи пропускает готовые файлы"""
+
+    def __init__(self, queue: JobQueue, job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+
+    async def load(self) -> Dict[str, Dict]:
+        return await self.queue.checkpoints(self.job_id)
+
+    async def save(self, file_path: str, record: Dict):
+        await self.queue.checkpoint(self.job_id, file_path, record)
+
+
+job_queue = JobQueue(
+    redis_service.redis,
+    Config.JOB_MAX_RUNNING,
+    Config.JOB_MAX_RUNNING_PER_USER,
+    Config.JOB_MAX_ATTEMPTS,
+    Config.JOB_LEASE_SECONDS,
+    Config.JOB_RETRY_DELAY_SECONDS,
+    Config.JOB_RESULT_TTL_SECONDS
+)
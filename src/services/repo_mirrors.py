@@ -0,0 +1,185 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Tuple
+import asyncio, hashlib, os, shutil, subprocess, time, uuid
+
+from config.config_app import Config
+from src.redis import redis_service
+from src.utils.git_source import GitTreeSource
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+CLONE_DIR = PROJECT_ROOT / "storage/repo_clones"
+
+# Ветка внутри зеркала, в которую забирается документируемая ревизия
+TARGET_REF = "refs/heads/docs-target"
+# Сколько ждать зеркало, занятое другим воркером (fetch большого репозитория)
+LOCK_TIMEOUT_SECONDS = 900
+# Рабочая копия или отметка чтения старше этого осталась от убитого воркера: задача столько не живет
+STALE_WORKTREE_SECONDS = 2 * 24 * 3600
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class RepositoryMirrors:
+    """Постоянные bare-зеркала репозиториев: повторный анализ делает `git fetch` только новых объектов
+    и worktree нужной ревизии вместо полного клона.
+
+    Зеркала лежат в `root/mirrors`, рабочие копии задач - в `root/worktrees`. Fetch и worktree одного
+    зеркала защищены блокировкой в Redis (воркеры могут быть на разных машинах с общим storage).
+    Давно не использованные зеркала сверх `max_bytes` удаляются, кроме занятых рабочими копиями
+    и чтениями объектов (`readers/` внутри зеркала).
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.mirrors_dir = root / "mirrors"
+        self.worktrees_dir = root / "worktrees"
+        self.max_bytes = max_bytes
+
+    def mirror_path(self, repo_url: str) -> Path:
+        normalized = repo_url.strip().rstrip("/")
+        if normalized.endswith(".git"):
+            normalized = normalized[:-4]
+        return self.mirrors_dir / f"{hashlib.sha1(normalized.lower().encode('utf-8')).hexdigest()}.git"
+
+    def _git(self, *args: str) -> str:
+        result = subprocess.run(["git", *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            raise GitError(result.stderr.strip())
+        return result.stdout
+
+    def _lock(self, mirror: Path):
+        return redis_service.redis.lock(f"mirror:{mirror.name}:lock", timeout=LOCK_TIMEOUT_SECONDS)
+
+    async def checkout(self, repo_url: str, fetch_url: str, ref: str = "HEAD") -> str:
+        """Обновляет зеркало и создает рабочую копию ревизии `ref`; путь освобождается через `release`.
+        `fetch_url` (с токеном) передается только в команду и не сохраняется в конфиге зеркала"""
+        return await asyncio.to_thread(self._checkout, repo_url, fetch_url, ref)
+
+    def _checkout(self, repo_url: str, fetch_url: str, ref: str) -> str:
+        mirror = self.mirror_path(repo_url)
+        worktree = self.worktrees_dir / uuid.uuid4().hex
+        self.worktrees_dir.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_leases()
+
+        with self._fetched(mirror, fetch_url, ref):
+            self._git("--git-dir", str(mirror), "worktree", "add", "--quiet", "--detach", str(worktree), TARGET_REF)
+
+        self._evict(keep=mirror)
+        return str(worktree)
+
+    async def open_revision(self, repo_url: str, fetch_url: str, ref: str = "HEAD") -> GitTreeSource:
+        """Обновляет зеркало и отдает файлы ревизии `ref` прямо из его объектов, без рабочей копии.
+        Пока источник не закрыт, зеркало не удаляется"""
+        return await asyncio.to_thread(self._open_revision, repo_url, fetch_url, ref)
+
+    def _open_revision(self, repo_url: str, fetch_url: str, ref: str) -> GitTreeSource:
+        mirror = self.mirror_path(repo_url)
+        self._remove_stale_leases()
+
+        with self._fetched(mirror, fetch_url, ref):
+            # Коммит, а не ветка: следующий fetch того же зеркала не подменит ревизию посреди анализа
+            commit = self._git("--git-dir", str(mirror), "rev-parse", f"{TARGET_REF}^{{commit}}").strip()
+            reader = mirror / "readers" / uuid.uuid4().hex
+            reader.parent.mkdir(exist_ok=True)
+            reader.touch()
+
+        self._evict(keep=mirror)
+        try:
+            return GitTreeSource(str(mirror), commit, on_close=lambda: reader.unlink(missing_ok=True))
+        except ValueError as e:
+            reader.unlink(missing_ok=True)
+            raise GitError(str(e))
+
+    @contextmanager
+    def _fetched(self, mirror: Path, fetch_url: str, ref: str):
+        """Держит блокировку зеркала, в котором ревизия `ref` уже забрана в TARGET_REF"""
+        lock = self._lock(mirror)
+        if not lock.acquire(blocking_timeout=LOCK_TIMEOUT_SECONDS):
+            raise GitError(f"Mirror {mirror.name} is busy")
+        try:
+            if not (mirror / "HEAD").exists():
+                self._git("init", "--bare", "--quiet", str(mirror))
+            # Мелкий fetch поверх уже скачанной ревизии передает только новые объекты
+            self._git("--git-dir", str(mirror), "fetch", "--quiet", "--depth", "1", "--force", "--no-tags",
+                      fetch_url, f"+{ref}:{TARGET_REF}")
+            yield
+            self._git("--git-dir", str(mirror), "gc", "--auto", "--quiet")
+            (mirror / "last_used").touch()
+        finally:
+            lock.release()
+
+    async def release(self, worktree: str):
+        await asyncio.to_thread(self._release, Path(worktree))
+
+    def _release(self, worktree: Path):
+        mirror = self._worktree_mirror(worktree)
+        shutil.rmtree(worktree, ignore_errors=True)
+        if mirror is None or not mirror.exists():
+            return
+        with self._lock(mirror):
+            self._git("--git-dir", str(mirror), "worktree", "prune")
+
+    def _worktree_mirror(self, worktree: Path):
+        """Зеркало рабочей копии по ее файлу .git: `gitdir: <зеркало>/worktrees/<имя>`"""
+        try:
+            gitdir = (worktree / ".git").read_text(encoding="utf-8").split("gitdir:", 1)[1].strip()
+        except (OSError, IndexError):
+            return None
+        return Path(gitdir).parent.parent
+
+    def _remove_stale_leases(self):
+        deadline = time.time() - STALE_WORKTREE_SECONDS
+        for worktree in self.worktrees_dir.glob("*"):
+            try:
+                if worktree.stat().st_mtime < deadline:
+                    self._release(worktree)
+            except (OSError, GitError) as e:
+                print(f"[!] Failed to remove stale worktree {worktree}: {e}")
+        for reader in self.mirrors_dir.glob("*.git/readers/*"):
+            try:
+                if reader.stat().st_mtime < deadline:
+                    reader.unlink()
+            except OSError:
+                pass
+
+    def _evict(self, keep: Path):
+        mirrors: List[Tuple[float, int, Path]] = []
+        for mirror in self.mirrors_dir.glob("*.git"):
+            marker = mirror / "last_used"
+            last_used = marker.stat().st_mtime if marker.exists() else 0.0
+            mirrors.append((last_used, _dir_size(mirror), mirror))
+
+        total = sum(size for _, size, _ in mirrors)
+        for _, size, mirror in sorted(mirrors):
+            if total <= self.max_bytes:
+                break
+            if mirror == keep:
+                continue
+            lock = self._lock(mirror)
+            # Занятое зеркало пропускается: его удалит следующая чистка
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                if any((mirror / "worktrees").glob("*")) or any((mirror / "readers").glob("*")):
+                    continue
+                shutil.rmtree(mirror, ignore_errors=True)
+                total -= size
+                print(f"[*] Evicted repository mirror {mirror.name} ({size} bytes)")
+            finally:
+                lock.release()
+
+
+repo_mirrors = RepositoryMirrors(CLONE_DIR, Config.REPO_MIRRORS_MAX_BYTES)
@@ -1,20 +1,32 @@
-from typing import Dict, List, Optional, Set
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Set, Tuple
 from fastapi import HTTPException, status
 from pathlib import Path
 from src.services.github_service import GitHubService, GitHubWebhookService
-from src.utils.doc_generator import generate_docs_for_group
+from src.utils.doc_generator import generate_docs_async, load_doc_groups, remove_doc, save_doc_groups
 from src.utils.dependency_analyzer import DependencyAnalyzer
+from src.utils.analysis_store import AnalysisStore
+from src.utils.git_source import GitTreeSource
+from src.utils.archive_ingest import ArchiveError, ArchiveIngest
 from src.services.ai_service import AIService
+from src.services.generation_engine import GenerationEngine
 from src.models.main_model import Repository, FileGroup
 from sqlalchemy.ext.asyncio import AsyncSession
-import uuid, os, shutil, asyncio, json, tempfile, zipfile
-from concurrent.futures import ProcessPoolExecutor
+import uuid, os, shutil, asyncio, json, tempfile
 from functools import partial
 from src.redis import redis_service
+from src.services.job_queue import job_queue, JobCheckpoints
+from config.config_app import Config
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
-CLONE_DIR = PROJECT_ROOT / "storage/repo_clones"
 ENCRYPTED_DIR_ROOT = PROJECT_ROOT / "storage/docs"
+ANALYSIS_DIR = PROJECT_ROOT / "storage/analysis"
+# Распакованные архивы ждут воркер здесь, а не в /tmp: воркер может работать в другом контейнере с общим storage
+UPLOAD_DIR = PROJECT_ROOT / "storage/uploads"
+
+def _analysis_store_path(user_id, repo_id) -> Path:
+    # Хранилище у каждой записи репозитория свое: повторный анализ той же ссылки не сдвигает базу,
+    # с которой сравниваются обновления по push у прежней записи
+    return ANALYSIS_DIR / str(user_id) / f"{repo_id}.sqlite"
 
 class RepositoryService:
     def __init__(self, db_session: AsyncSession, github_token: str):
@@ -22,82 +34,326 @@ class RepositoryService:
         self.github_service = GitHubService(github_token)
         self.git_webhook = GitHubWebhookService(github_token)
         self.ai_service = AIService()
-        self.executor = ProcessPoolExecutor(max_workers=2)
         
     async def process_repository(self, repo_url: str, user_id: uuid.UUID) -> Dict:
+        """Ставит репозиторий в очередь: клонирование и генерация выполняются воркером (src.worker)"""
         try: 
             repo_info = await self.github_service.get_repo_info(repo_url)
-            CLONE_DIR.mkdir(exist_ok=True)
-            temp_dir = await self.github_service.clone_repository(repo_url, str(CLONE_DIR / str(user_id)))
-            
-            if not os.path.exists(temp_dir):
-                raise HTTPException(status_code=500, detail="Failed to clone repository")
-
             repo_id = uuid.uuid4()
             
-            asyncio.create_task(self._process_repository_background(repo_id, temp_dir, repo_url, user_id, repo_info))
+            job_id = await job_queue.enqueue("repository", user_id, {
+                "repo_id": str(repo_id),
+                "repo_url": repo_url,
+                "repo_info": {"name": repo_info["name"]}
+            })
+            await redis_service.set_key(f"repo:{repo_id}:job", job_id, expire=Config.JOB_RESULT_TTL_SECONDS)
             
             return {
                 "status": "processing",
                 "message": "Генерация была начата. В скором времени мы сообщим о ее готовности.",
                 "repo_id": repo_id,
-                "user_id": str(user_id)
+                "user_id": str(user_id),
+                "job_id": job_id
             }
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Repository processing failed: {str(e)}")
     
     async def process_zip_repository(self, zip_path: str, user_id: uuid.UUID) -> Dict:
+        with open(zip_path, "rb") as archive:
+            return await self.import_archive(archive, os.path.basename(zip_path), user_id)
+    
+    async def import_archive(self, archive: BinaryIO, archive_name: str, user_id: uuid.UUID) -> Dict:
+        """Потоково распаковывает из архива только файлы, которые разбирает анализатор, и ставит их в очередь"""
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix="repo_zip_", dir=UPLOAD_DIR)
+        ingest = ArchiveIngest(
+            temp_dir,
+            DependencyAnalyzer.SUPPORTED_EXTENSIONS,
+            Config.ANALYSIS_MAX_FILE_BYTES,
+            Config.ARCHIVE_MAX_EXTRACTED_BYTES
+        )
         try:
-            temp_dir = tempfile.mkdtemp(prefix="repo_zip_")
-            
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            
-            repo_id = uuid.uuid4()
-            
-            asyncio.create_task(
-                self._process_repository_background(
-                    repo_id,
-                    temp_dir,
-                    f"ZIP Archive: {os.path.basename(zip_path)}",
-                    user_id,
-                    {"name": os.path.basename(zip_path)}
-                )
-            )
-            
-            return {
-                "status": "processing",
-                "message": "Генерация документации начата",
-                "repo_id": str(repo_id),
-                "user_id": str(user_id)
-            }
-        except zipfile.BadZipFile:
+            files = await asyncio.to_thread(ingest.extract, archive, archive_name)
+        except ArchiveError as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Некорректный ZIP архив"
+                detail=f"Некорректный архив: {e}"
             )
         except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Ошибка обработки архива: {str(e)}"
             )
+        
+        if not files:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="В архиве нет файлов с поддерживаемым кодом"
+            )
+        return await self.enqueue_archive(temp_dir, archive_name, user_id)
     
-    async def _process_repository_background(self, repo_id: uuid.UUID,  temp_dir: str, repo_url: str, user_id: uuid.UUID, repo_info: Dict):
+    async def enqueue_archive(self, temp_dir: str, archive_name: str, user_id: uuid.UUID) -> Dict:
+        """Ставит в очередь распакованный архив; каталог удаляет воркер после обработки"""
+        repo_id = uuid.uuid4()
+        job_id = await job_queue.enqueue("archive", user_id, {
+            "repo_id": str(repo_id),
+            "path": temp_dir,
+            "repo_url": f"ZIP Archive: {archive_name}",
+            "repo_info": {"name": archive_name}
+        })
+        await redis_service.set_key(f"repo:{repo_id}:job", job_id, expire=Config.JOB_RESULT_TTL_SECONDS)
+        
+        return {
+            "status": "processing",
+            "message": "Генерация документации начата",
+            "repo_id": str(repo_id),
+            "user_id": str(user_id),
+            "job_id": job_id
+        }
+    
+    async def run_job(self, job: Dict):
+        """Выполняет задачу очереди. Исключение означает неудачную попытку: очередь повторит задачу"""
+        payload = job["payload"]
+        user_id = uuid.UUID(job["user_id"])
+        final_attempt = job["attempts"] >= Config.JOB_MAX_ATTEMPTS
+        
+        if job["kind"] == "update":
+            # Следующий push ставит новое обновление, даже если это еще идет
+            await redis_service.delete_key(f"repo:{payload['repo_id']}:update_pending")
+            repo = await self.session.get(Repository, uuid.UUID(payload["repo_id"]))
+            if repo is None:
+                print(f"[!] Repository {payload['repo_id']} was deleted, update skipped")
+                return
+        
+        source, downloaded = None, False
+        if job["kind"] in ("repository", "update"):
+            source, temp_dir, downloaded = await self._fetch_repository(payload["repo_url"])
+        else:
+            temp_dir = payload["path"]
+        
+        succeeded = False
         try:
-            analyzer = DependencyAnalyzer(temp_dir)
-            file_groups, file_details = analyzer.analyze_repository()
+            if job["kind"] == "update":
+                await self._update_repository(repo, temp_dir, job["id"], final_attempt, source)
+            else:
+                await self._process_repository_background(
+                    uuid.UUID(payload["repo_id"]), temp_dir, payload["repo_url"], user_id, payload["repo_info"],
+                    job["id"], final_attempt, source
+                )
+                if job["kind"] == "repository":
+                    await self._configure_webhook(uuid.UUID(payload["repo_id"]), payload["repo_url"])
+            succeeded = True
+        finally:
+            # Рабочая копия на повторе создается заново, а распакованный архив нужен до последней попытки
+            if source is not None:
+                await asyncio.to_thread(source.close)
+            elif downloaded:
+                await asyncio.to_thread(shutil.rmtree, temp_dir, True)
+            elif job["kind"] != "archive":
+                await self.github_service.release_checkout(temp_dir)
+            elif succeeded or final_attempt:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    async def _fetch_repository(self, repo_url: str) -> Tuple[Optional[GitTreeSource], str, bool]:
+        """Ревизия репозитория по REPO_FETCH_MODE: объекты или рабочая копия зеркала (git) либо файлы,
+        скачанные во временный каталог через API (api) или архивом (tarball). Третий элемент - каталог скачан
+        и удаляется после задачи"""
+        if Config.REPO_FETCH_MODE in ("api", "tarball"):
+            UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+            temp_dir = tempfile.mkdtemp(prefix=f"repo_{Config.REPO_FETCH_MODE}_", dir=UPLOAD_DIR)
+            try:
+                if Config.REPO_FETCH_MODE == "api":
+                    await self.github_service.download_repository(repo_url, temp_dir, supported_only=True)
+                else:
+                    await self.github_service.download_archive(repo_url, temp_dir)
+            except Exception:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                raise
+            return None, temp_dir, True
+        
+        if Config.ANALYSIS_FROM_GIT_OBJECTS:
+            source = await self.github_service.open_revision(repo_url)
+            return source, source.git_dir, False
+        return None, await self.github_service.checkout_repository(repo_url), False
+    
+    async def enqueue_update(self, repo: Repository, modified_files: List[str]) -> Optional[str]:
+        """Ставит в очередь обновление документации после push; пока прошлое обновление ждет в очереди, новое не нужно"""
+        pending_key = f"repo:{repo.id}:update_pending"
+        if not await redis_service.set_key_if_absent(pending_key, 1, expire=Config.JOB_RESULT_TTL_SECONDS):
+            return None
+        
+        job_id = await job_queue.enqueue("update", repo.user_id, {
+            "repo_id": str(repo.id),
+            "repo_url": repo.ssh_url,
+            "modified_files": modified_files
+        })
+        await redis_service.set_key(f"repo:{repo.id}:job", job_id, expire=Config.JOB_RESULT_TTL_SECONDS)
+        return job_id
+    
+    async def _configure_webhook(self, repo_id: uuid.UUID, repo_url: str):
+        """Подписывает репозиторий на push-события, чтобы документация обновлялась по изменениям"""
+        if not Config.WEBHOOK_BASE_URL or not Config.GITHUB_WEBHOOK_SECRET:
+            return
+        repo = await self.session.get(Repository, repo_id)
+        if repo is None or repo.webhook_configured:
+            return
+        try:
+            webhook = await self.git_webhook.create_repository_webhook(
+                repo_url, f"{Config.WEBHOOK_BASE_URL.rstrip('/')}/github/webhook"
+            )
+            repo.webhook_id = webhook["id"]
+            repo.webhook_configured = True
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            print(f"[!] Failed to configure webhook for {repo_url}: {e}")
+    
+    async def _update_repository(
+        self, repo: Repository, temp_dir: str, job_id: str, final_attempt: bool, source: Optional[GitTreeSource] = None
+    ):
+        """Инкрементальное обновление: заново разбираются только файлы с другим хэшем содержимого,
+        документация генерируется для них (и, по настройке, для их прямых зависимых), остальные .md не трогаются.
+
+        Хранилище анализа сохраняется только после генерации: повтор упавшей задачи видит те же изменения,
+        а файлы, документация которых так и не получилась, остаются измененными для следующего обновления"""
+        loop = asyncio.get_running_loop()
+        store = await loop.run_in_executor(None, AnalysisStore, str(_analysis_store_path(repo.user_id, repo.id)))
+        previous = {path: entry["hash"] for path, entry in store.entries.items()}
+        
+        analyzer = await loop.run_in_executor(
+            None,
+            partial(
+                DependencyAnalyzer,
+                temp_dir,
+                Config.ANALYSIS_WORKERS,
+                store=store,
+                ignore_patterns=Config.ANALYSIS_IGNORE,
+                max_file_bytes=Config.ANALYSIS_MAX_FILE_BYTES,
+                source=source
+            )
+        )
+        file_groups, file_details = await loop.run_in_executor(
+            None, partial(analyzer.analyze_repository, generate_reports=False, save_store=False)
+        )
+        
+        # Сравнение с прошлым анализом надежнее списка файлов из события: в payload push не больше 20 коммитов
+        current = analyzer.store_entries()
+        changed = {path for path, entry in current.items() if previous.get(path) != entry["hash"]}
+        removed = set(previous) - set(current)
+        targets = set(changed)
+        if Config.WEBHOOK_REGENERATE_DEPENDENTS:
+            targets |= {path for path, entry in current.items() if changed.intersection(entry["deps"])}
+        
+        docs_dir = Path(repo.encrypted_dir_path)
+        doc_groups = await loop.run_in_executor(None, load_doc_groups, docs_dir)
+        files, new_groups = self._place_files(doc_groups, targets, file_groups)
+        await loop.run_in_executor(None, self._remove_docs, docs_dir, doc_groups, removed)
+        doc_groups.update((path, group_idx) for group_idx, path in files)
+        await loop.run_in_executor(None, save_doc_groups, docs_dir, doc_groups)
+        print(f"[*] Updating {repo.ssh_url}: {len(changed)} changed, {len(targets) - len(changed)} dependents, {len(removed)} removed")
+        
+        if new_groups:
+            self.session.add_all(FileGroup(repo_id=repo.id, name=f"Group {group_idx}") for group_idx in new_groups)
+            await self.session.commit()
+        
+        progress = {"completed": 0, "failed": 0, "total": len(files)}
+        failed_files: Set[str] = set()
+        await self._generate_files(
+            temp_dir, files, file_details, docs_dir, analyzer,
+            partial(self._notify_progress, repo.user_id, repo.id, job_id, progress, failed_files=failed_files),
+            JobCheckpoints(job_queue, job_id)
+        )
+        if progress["failed"] and not final_attempt:
+            raise RuntimeError(f"Documentation failed for {progress['failed']} of {progress['total']} files")
+        await loop.run_in_executor(None, analyzer.save_store, failed_files)
+        
+        await self._notify_user(repo.user_id, repo.id)
+    
+    def _place_files(self, doc_groups: Dict[str, int], targets: Set[str], file_groups: List[Set[str]]) -> Tuple[List[Tuple[int, str]], List[int]]:
+        """Номера групп для обновляемых файлов: документация остается в своей группе, новый файл идет
+        в группу соседа по зависимостям, у которого есть документация, иначе в новую группу"""
+        next_group = max(doc_groups.values(), default=0) + 1
+        files, new_groups = [], []
+        
+        for group in file_groups:
+            group_targets = sorted(group & targets)
+            if not group_targets:
+                continue
+            known = [doc_groups[path] for path in sorted(group) if path in doc_groups]
+            fallback = known[0] if known else None
+            for path in group_targets:
+                group_idx = doc_groups.get(path, fallback)
+                if group_idx is None:
+                    group_idx = fallback = next_group
+                    new_groups.append(next_group)
+                    next_group += 1
+                files.append((group_idx, path))
+        
+        return files, new_groups
+    
+    def _remove_docs(self, docs_dir: Path, doc_groups: Dict[str, int], removed: Set[str]):
+        """Удаляет документацию удаленных файлов и убирает их из `doc_groups`"""
+        for path in removed:
+            group_idx = doc_groups.pop(path, None)
+            if group_idx is not None:
+                remove_doc(docs_dir, group_idx, path)
+    
+    async def _process_repository_background(
+        self, repo_id: uuid.UUID, temp_dir: str, repo_url: str, user_id: uuid.UUID, repo_info: Dict,
+        job_id: Optional[str] = None, final_attempt: bool = True, source: Optional[GitTreeSource] = None
+    ):
+        """Анализ и генерация документации (файлы с диска `temp_dir` или из объектов git `source`). Готовые файлы отмечаются в состоянии задачи `job_id`:
+        повтор задачи генерирует только недостающие. Если часть файлов не удалась, а попытки еще есть,
+        задача падает, чтобы очередь ее повторила"""
+        try:
+            loop = asyncio.get_running_loop()
+            # Результаты прошлых анализов этого репозитория: неизмененные файлы не разбираются заново
+            store = await loop.run_in_executor(None, AnalysisStore, str(_analysis_store_path(user_id, repo_id)))
+            analyzer = await loop.run_in_executor(
+                None,
+                partial(
+                    DependencyAnalyzer,
+                    temp_dir,
+                    Config.ANALYSIS_WORKERS,
+                    store=store,
+                    ignore_patterns=Config.ANALYSIS_IGNORE,
+                    max_file_bytes=Config.ANALYSIS_MAX_FILE_BYTES,
+                    source=source
+                )
+            )
+            # Отчеты и DOT-файлы пишутся во временный каталог, который удаляется после генерации
+            file_groups, file_details = await loop.run_in_executor(
+                None, partial(analyzer.analyze_repository, generate_reports=False, save_store=False)
+            )
             
             docs_dir = ENCRYPTED_DIR_ROOT / str(user_id) / str(repo_id)
-            
-            await self._generate_documentation(temp_dir, file_groups, file_details, docs_dir)
+            # Репозиторий появляется в профиле до конца генерации: готовые файлы видны в просмотре документации
             await self._save_repo_to_db(repo_id, user_id, repo_info['name'], repo_url, str(docs_dir), file_groups)
+            # Обновления по push находят группу документа по полному пути файла
+            doc_groups = {path: group_idx for group_idx, group in enumerate(file_groups, 1) for path in group}
+            await loop.run_in_executor(None, save_doc_groups, docs_dir, doc_groups)
+            
+            progress = {"completed": 0, "failed": 0, "total": sum(len(group) for group in file_groups)}
+            failed_files: Set[str] = set()
+            await self._generate_documentation(
+                temp_dir, file_groups, file_details, docs_dir, analyzer,
+                partial(self._notify_progress, user_id, repo_id, job_id, progress, failed_files=failed_files),
+                JobCheckpoints(job_queue, job_id) if job_id else None
+            )
+            if progress["failed"] and not final_attempt:
+                raise RuntimeError(f"Documentation failed for {progress['failed']} of {progress['total']} files")
+            # Хранилище общее с обновлениями по push: оно отражает только файлы с готовой документацией
+            await loop.run_in_executor(None, analyzer.save_store, failed_files)
             
             await self._notify_user(user_id, repo_id)
         except Exception as e:
             print(f"Error processing repository: {e}")
-        finally:
-            if not repo_url.startswith("zip:"):
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
     
     async def _notify_user(self, user_id: uuid.UUID, repo_id: uuid.UUID):
         """Отправляет уведомление пользователю через WebSocket"""
@@ -109,35 +365,78 @@ class RepositoryService:
         }
         await redis_service.publish(f"user:{user_id}:ws", json.dumps(message))
     
+    async def notify_failed(self, user_id: uuid.UUID, repo_id: uuid.UUID, error: str):
+        """Сообщает пользователю, что попытки обработки репозитория кончились"""
+        message = {
+            "status": "failed",
+            "repo_id": str(repo_id),
+            "user_id": str(user_id),
+            "error": error
+        }
+        await redis_service.publish(f"user:{user_id}:ws", json.dumps(message))
+    
+    async def _notify_progress(
+        self, user_id: uuid.UUID, repo_id: uuid.UUID, job_id: Optional[str], progress: Dict, event: Dict,
+        failed_files: Optional[Set[str]] = None
+    ):
+        """Отправляет событие генерации по файлу и счетчики готовых файлов через WebSocket"""
+        if event["event"] in ("file_done", "file_resumed"):
+            progress["completed"] += 1
+        elif event["event"] == "file_failed":
+            progress["failed"] += 1
+            if failed_files is not None:
+                failed_files.add(event["file"])
+        if job_id and event["event"] in ("file_done", "file_resumed", "file_failed"):
+            await job_queue.set_progress(job_id, progress["completed"], progress["total"])
+        message = {
+            "status": "progress",
+            "repo_id": str(repo_id),
+            "user_id": str(user_id),
+            **event,
+            **progress
+        }
+        await redis_service.publish(f"user:{user_id}:ws", json.dumps(message))
+    
     async def _generate_documentation(
         self, 
         repo_path: str, 
         file_groups: List[Set[str]], 
         file_details: Dict, 
-        docs_dir: Path
+        docs_dir: Path,
+        analyzer: Optional[DependencyAnalyzer] = None,
+        on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        checkpoints: Optional[JobCheckpoints] = None
     ):
+        # Все файлы генерируются конкурентно, очередь к лимитам модели идет в порядке запуска: крупные файлы
+        # (больше запросов) стартуют первыми, чтобы не оказаться последними в хвосте задачи
+        files = [(group_idx, path) for group_idx, group in enumerate(file_groups, 1) for path in sorted(group)]
+        files.sort(key=lambda item: -file_details.get(item[1], {}).get("size", 0))
+        await self._generate_files(repo_path, files, file_details, docs_dir, analyzer, on_progress, checkpoints)
+    
+    async def _generate_files(
+        self,
+        repo_path: str,
+        files: List[Tuple[int, str]],
+        file_details: Dict,
+        docs_dir: Path,
+        analyzer: Optional[DependencyAnalyzer] = None,
+        on_progress: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        checkpoints: Optional[JobCheckpoints] = None
+    ):
+        """Генерирует документацию для списка (номер группы, путь файла)"""
         docs_dir.mkdir(parents=True, exist_ok=True)
         loop = asyncio.get_running_loop()
         
-        tasks = []
-        for group_idx, group in enumerate(file_groups, 1):
-            if not group:
-                continue 
-
-            group_task = loop.run_in_executor(
-                self.executor,
-                partial(
-                    generate_docs_for_group,
-                    group_idx,
-                    list(group),
-                    repo_path,
-                    file_details,
-                    docs_dir
-                )
+        file_contents = None
+        if analyzer is not None:
+            file_contents = await loop.run_in_executor(
+                None, lambda: {path: analyzer.get_file_content(path) for _, path in files}
             )
-            tasks.append(group_task)
         
-        await asyncio.gather(*tasks)
+        # Движок общий для всех задач процесса: лимиты модели не умножаются на число одновременных задач
+        await generate_docs_async(
+            files, repo_path, file_details, docs_dir, AIService(GenerationEngine.shared()), file_contents, on_progress, checkpoints
+        )
         
     async def _save_repo_to_db(
         self, repo_id: uuid.UUID, user_id: uuid.UUID,
@@ -145,6 +444,10 @@ class RepositoryService:
         file_groups: List[List[str]]
     ):
         try:
+            # Повтор задачи: запись уже создана прошлой попыткой
+            if await self.session.get(Repository, repo_id) is not None:
+                return
+            
             repo = Repository(
                 id=repo_id,
                 user_id=user_id,
@@ -169,15 +472,6 @@ class RepositoryService:
             await self.session.rollback()
             raise
 
-    def _find_file_group(self, docs_dir: Path, file_path: str) -> Optional[Path]:
-        file_name = os.path.basename(file_path)
-        doc_pattern = f"{file_name}.md"
-
-        for group_dir in docs_dir.glob("group_*"):
-            if (group_dir / doc_pattern).exists():
-                return group_dir
-        return None
-        
     async def _get_repository_by_url(self, repo_url: str, user_id: uuid.UUID) -> Optional[Repository]:
         from sqlalchemy.future import select
         
@@ -201,6 +495,7 @@ async def delete_repository(session, user_id: str, repo_id: str):
         docs_path = os.path.join(ENCRYPTED_DIR_ROOT, str(user_id), str(repo_id))
         if os.path.exists(docs_path):
             shutil.rmtree(docs_path)
+        _analysis_store_path(user_id, repo_id).unlink(missing_ok=True)
             
         await session.execute(
             delete(FileGroup).where(FileGroup.repo_id == repo_id)
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional
+
+# Меняется вместе с парсерами и анализаторами структуры: записи старой версии не переиспользуются
+STORE_VERSION = "3"
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class AnalysisStore:
+    """Постоянное хранилище результатов анализа репозитория: путь -> хэш содержимого, импорты, структура, ребра.
+
+    Лежит в SQLite, поэтому повторный анализ перезаписывает только строки измененных файлов.
+    Соединение открывается на каждую операцию: хранилище создается и используется в разных потоках executor'а.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.index_key: Optional[str] = None
+        self.entries: Dict[str, Dict] = {}
+        self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, hash TEXT, size INTEGER, mtime INTEGER, imports TEXT, analysis TEXT, deps TEXT)"
+        )
+        return connection
+
+    def _load(self):
+        try:
+            with closing(self._connect()) as connection:
+                meta = dict(connection.execute("SELECT key, value FROM meta"))
+                if meta.get("version") != STORE_VERSION:
+                    return
+                self.index_key = meta.get("index_key")
+                for path, file_hash, size, mtime, imports, analysis, deps in connection.execute("SELECT * FROM files"):
+                    self.entries[path] = {
+                        "hash": file_hash,
+                        "size": size,
+                        "mtime": mtime,
+                        "imports": json.loads(imports),
+                        "analysis": json.loads(analysis),
+                        "deps": json.loads(deps)
+                    }
+        except sqlite3.Error as e:
+            print(f"[!] Analysis store {self.path} is unreadable, starting from scratch: {e}")
+            self.index_key, self.entries = None, {}
+
+    def get(self, rel_path: str) -> Optional[Dict]:
+        return self.entries.get(rel_path)
+
+    def save(self, entries: Dict[str, Dict], index_key: str):
+        """Приводит хранилище к текущему состоянию репозитория: пишет только измененные строки, удаленные файлы убирает"""
+        changed = [
+            (path, entry["hash"], entry["size"], entry["mtime"],
+             json.dumps(entry["imports"]), json.dumps(entry["analysis"], ensure_ascii=False), json.dumps(entry["deps"]))
+            for path, entry in entries.items()
+            if self.entries.get(path, {}).get("hash") != entry["hash"]
+        ]
+        moved = [
+            (json.dumps(entry["deps"]), entry["mtime"], path)
+            for path, entry in entries.items()
+            if path in self.entries and self.entries[path]["hash"] == entry["hash"]
+            and (self.entries[path]["deps"] != entry["deps"] or self.entries[path]["mtime"] != entry["mtime"])
+        ]
+        removed = [(path,) for path in self.entries if path not in entries]
+
+        with closing(self._connect()) as connection, connection:
+            if not self.entries:
+                # Пустое хранилище или записи другой версии
+                connection.execute("DELETE FROM files")
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (STORE_VERSION,))
+            connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", changed)
+            connection.executemany("UPDATE files SET deps = ?, mtime = ? WHERE path = ?", moved)
+            connection.executemany("DELETE FROM files WHERE path = ?", removed)
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('index_key', ?)", (index_key,))
+
+        self.entries = entries
+        self.index_key = index_key
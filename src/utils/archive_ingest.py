@@ -0,0 +1,154 @@
+import asyncio
+import io
+import os
+import stat
+import tarfile
+import zipfile
+from typing import AsyncIterator, BinaryIO, Iterable, List, Optional, Set
+
+from src.utils.module_resolvers import PROJECT_MARKERS
+from src.utils.repo_walker import MAX_FILE_BYTES
+
+ZIP_SUFFIXES = ('.zip',)
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ARCHIVE_SUFFIXES = ZIP_SUFFIXES + TAR_SUFFIXES
+# Файлы, нужные анализатору при любом фильтре расширений: правила игнорирования и манифесты проектов
+ALWAYS_KEPT = {'.gitignore'} | set(PROJECT_MARKERS)
+COPY_CHUNK_BYTES = 256 * 1024
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def is_wanted(path: str, extensions: Optional[Set[str]]) -> bool:
+    """Нужен ли файл анализу: `extensions` - допустимые расширения в нижнем регистре, None - любые"""
+    name = os.path.basename(path)
+    return extensions is None or name in ALWAYS_KEPT or os.path.splitext(name)[1].lower() in extensions
+
+
+class ArchiveIngest:
+    """Потоковая распаковка архива: записи читаются по одной, на диск пишутся только файлы, нужные анализу.
+
+    Архив не распаковывается целиком и не копируется: tar читается последовательно (подходит и для
+    потока из сети), zip - по центральному каталогу из исходного файла. Файл больше `max_file_bytes`
+    пропускается, даже если архив занизил его размер; распакованный объем сверх `max_total_bytes` -
+    ошибка (защита от zip-бомб).
+    """
+
+    def __init__(
+        self,
+        target_dir: str,
+        extensions: Optional[Iterable[str]] = None,
+        max_file_bytes: int = MAX_FILE_BYTES,
+        max_total_bytes: Optional[int] = None,
+        strip_components: int = 0
+    ):
+        self.target_root = os.path.realpath(target_dir)
+        self.extensions = {ext.lower() for ext in extensions} if extensions is not None else None
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.strip_components = strip_components
+        self.total_bytes = 0
+        self.files: List[str] = []
+
+    def extract(self, fileobj: BinaryIO, archive_name: str) -> List[str]:
+        """Распаковывает нужные файлы и возвращает их пути относительно `target_dir`"""
+        name = archive_name.lower()
+        if name.endswith(ZIP_SUFFIXES):
+            self._extract_zip(fileobj)
+        elif name.endswith(TAR_SUFFIXES):
+            self._extract_tar(fileobj)
+        else:
+            raise ArchiveError(f"Unsupported archive format: {archive_name}")
+        return self.files
+
+    def _extract_zip(self, fileobj: BinaryIO):
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile as e:
+            raise ArchiveError(f"Invalid ZIP archive: {e}")
+
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or stat.S_ISLNK(info.external_attr >> 16) or info.flag_bits & 0x1:
+                    continue
+                path = self._target_path(info.filename, info.file_size)
+                if path is None:
+                    continue
+                try:
+                    with archive.open(info) as source:
+                        self._copy(source, path)
+                except (zipfile.BadZipFile, NotImplementedError) as e:
+                    print(f"[!] Skipping {info.filename}: {e}")
+
+    def _extract_tar(self, fileobj: BinaryIO):
+        try:
+            # "r|*" - последовательное чтение со сжатием любого вида, без перемотки назад
+            with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    path = self._target_path(member.name, member.size)
+                    if path is None:
+                        continue
+                    source = archive.extractfile(member)
+                    if source is not None:
+                        self._copy(source, path)
+        except tarfile.TarError as e:
+            raise ArchiveError(f"Invalid TAR archive: {e}")
+
+    def _target_path(self, member_name: str, size: int) -> Optional[str]:
+        """Путь для записи на диске или None, если запись не нужна или выходит за целевой каталог"""
+        parts = [part for part in member_name.replace("\\", "/").split("/") if part not in ("", ".")]
+        parts = parts[self.strip_components:]
+        if not parts or ".." in parts or size > self.max_file_bytes or not is_wanted(parts[-1], self.extensions):
+            return None
+        path = os.path.realpath(os.path.join(self.target_root, *parts))
+        return path if path.startswith(self.target_root + os.sep) else None
+
+    def _copy(self, source: BinaryIO, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        written = 0
+        with open(path, "wb") as f:
+            while True:
+                chunk = source.read(COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                written += len(chunk)
+                self.total_bytes += len(chunk)
+                if self.max_total_bytes is not None and self.total_bytes > self.max_total_bytes:
+                    raise ArchiveError("Archive is too large after extraction")
+                if written > self.max_file_bytes:
+                    break
+                f.write(chunk)
+
+        if written > self.max_file_bytes:
+            os.remove(path)
+            return
+        self.files.append(os.path.relpath(path, self.target_root))
+
+
+class AsyncIteratorReader(io.RawIOBase):
+    """Синхронный файл поверх асинхронного потока байтов (тело HTTP-ответа) для распаковки в потоке:
+    части забираются из event loop по мере чтения, поэтому в памяти не больше одной части"""
+
+    def __init__(self, chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self.chunks = chunks
+        self.loop = loop
+        self.buffer = b""
+        self.finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self.buffer and not self.finished:
+            try:
+                self.buffer = asyncio.run_coroutine_threadsafe(self.chunks.__anext__(), self.loop).result()
+            except StopAsyncIteration:
+                self.finished = True
+        size = min(len(target), len(self.buffer))
+        target[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
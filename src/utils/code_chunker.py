@@ -0,0 +1,106 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.tokenizer import count_tokens
+
+# Разделы структуры, которые содержат другие определения: по ним файл режется в первую очередь
+CONTAINER_KEYS = {'classes', 'structs', 'interfaces', 'enums', 'protocols', 'modules', 'data_types'}
+# Строки над определением, которые относятся к нему: декораторы, атрибуты, комментарии
+ATTACHED_PREFIXES = ('@', '#[', '#', '//', '/*', '*', '--')
+
+
+def structure_boundaries(structure: Optional[Dict]) -> List[List[int]]:
+    """Номера строк начала определений из анализатора структуры, по уровням: сначала крупные, затем вложенные"""
+    if not structure:
+        return []
+
+    if structure.get("parser") == "ast":
+        top = [item["line"] for key in ("classes", "functions") for item in structure.get(key, [])]
+        nested = [
+            member["line"]
+            for cls in structure.get("classes", [])
+            for key in ("methods", "classes")
+            for member in cls.get(key, [])
+        ]
+        return [sorted(set(top)), sorted(set(nested))]
+
+    containers, members = set(), set()
+
+    def collect(node, key: Optional[str] = None):
+        if isinstance(node, dict):
+            if isinstance(node.get("line"), int):
+                (containers if key in CONTAINER_KEYS else members).add(node["line"])
+            for child_key, child in node.items():
+                collect(child, child_key if isinstance(child, list) else key)
+        elif isinstance(node, list):
+            for item in node:
+                collect(item, key)
+
+    collect(structure)
+    return [sorted(containers), sorted(members - containers)]
+
+
+def _attach_leading_lines(lines: List[str], start: int, lower: int) -> int:
+    """Поднимает границу над декораторами и комментариями, относящимися к определению"""
+    while start > lower and lines[start - 1].strip().startswith(ATTACHED_PREFIXES):
+        start -= 1
+    return start
+
+
+def _split_range(lines: List[str], costs: List[int], start: int, end: int, levels: List[List[int]], budget: int) -> List[Tuple[int, int]]:
+    """Делит строки [start, end) на куски не больше бюджета, по возможности по границам определений"""
+    if sum(costs[start:end]) <= budget:
+        return [(start, end)]
+
+    if levels:
+        cuts = sorted({
+            _attach_leading_lines(lines, line - 1, start)
+            for line in levels[0]
+            if start < line - 1 < end
+        })
+        cuts = [cut for cut in cuts if start < cut < end]
+        if cuts:
+            pieces = []
+            for piece_start, piece_end in zip([start] + cuts, cuts + [end]):
+                pieces.extend(_split_range(lines, costs, piece_start, piece_end, levels[1:], budget))
+            return pieces
+        return _split_range(lines, costs, start, end, levels[1:], budget)
+
+    # Определение больше бюджета и без внутренних границ: режем по строкам
+    pieces = []
+    piece_start, total = start, 0
+    for i in range(start, end):
+        if total and total + costs[i] > budget:
+            pieces.append((piece_start, i))
+            piece_start, total = i, 0
+        total += costs[i]
+    pieces.append((piece_start, end))
+    return pieces
+
+
+def split_code(content: str, budget: int, structure: Optional[Dict] = None) -> List[str]:
+    """Разбивает код на фрагменты не больше `budget` токенов.
+
+    Разрезы идут по границам классов и функций из анализатора структуры, соседние куски
+    упаковываются вместе, пока помещаются в бюджет, чтобы запросов было меньше.
+    """
+    lines = content.splitlines(keepends=True)
+    if not lines:
+        return [content]
+
+    costs = [count_tokens(line) for line in lines]
+    pieces = _split_range(lines, costs, 0, len(lines), structure_boundaries(structure), budget)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_cost = 0
+    for piece_start, piece_end in pieces:
+        cost = sum(costs[piece_start:piece_end])
+        if current and current_cost + cost > budget:
+            chunks.append("".join(current))
+            current, current_cost = [], 0
+        current.extend(lines[piece_start:piece_end])
+        current_cost += cost
+
+    if current:
+        chunks.append("".join(current))
+    return chunks
@@ -1,9 +1,18 @@
 import os
-import re
 from pathlib import Path
-from collections import defaultdict, deque
-from typing import Dict, Set, List, Tuple, Optional
-
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Set, List, Tuple, Optional
+from src.utils.module_resolvers import ModuleIndex, PROJECT_MARKERS, build_resolvers
+from src.utils.disjoint_set import DisjointSet
+from src.utils.language_patterns import PATTERNS
+from src.utils.line_index import LineIndex
+from src.utils.analysis_store import AnalysisStore, content_hash
+from src.utils.repo_walker import MAX_FILE_BYTES, RepositoryWalker, is_generated_content, is_generated_file
+from src.utils.git_source import GitTreeSource
+
+# Порядок расширений при разрешении импорта без расширения; остальные идут в порядке SUPPORTED_EXTENSIONS
+RESOLVE_EXTENSION_ORDER = ['.js', '.ts', '.mjs', '.cjs']
 
 class DependencyAnalyzer:
     SUPPORTED_EXTENSIONS = {
@@ -80,45 +89,130 @@ class DependencyAnalyzer:
         # Протофайлы
         '.proto': 'Protocol Buffers'
     }
-
-    def __init__(self, repo_path: str):
+    
+    # Меньше этого числа файлов разбор идет в текущем процессе: запуск пула дороже самого разбора
+    PARALLEL_MIN_FILES = 200
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(
+        self,
+        repo_path: str,
+        workers: Optional[int] = None,
+        collect_files: bool = True,
+        store: Optional[AnalysisStore] = None,
+        ignore_patterns: Optional[List[str]] = None,
+        max_file_bytes: int = MAX_FILE_BYTES,
+        source: Optional[GitTreeSource] = None
+    ):
+        """`source` - файлы берутся из объектов git (repo_path тогда - каталог bare-зеркала), а не с диска"""
         self.repo_path = os.path.abspath(repo_path)
         if not os.path.isdir(self.repo_path):
             raise ValueError(f"Invalid repository path: {self.repo_path}")
+        self.workers = workers or os.cpu_count() or 1
         self.files_by_extension = defaultdict(list)
-        self._collect_files()
+        self.project_markers: List[str] = []
+        self._file_cache: Dict[str, Dict] = {}
+        self._file_index: Dict[str, str] = {}
+        self._stem_index: Dict[str, str] = {}
+        self._dir_index: Dict[str, str] = {}
+        self._resolve_cache: Dict[Tuple[str, str], List[str]] = {}
+        self._module_index: Optional[ModuleIndex] = None
+        self._resolved_deps: Dict[str, Set[str]] = {}
+        self._resolvers = build_resolvers()
+        self._store = store
+        self._source = source
+        # Содержимое новых блобов, прочитанное при сборе файлов: разбор не читает их повторно
+        self._blobs: Dict[str, bytes] = {}
+        self.ignore_patterns = ignore_patterns or []
+        self.max_file_bytes = max_file_bytes
+        self._ext_rank = {ext: i for i, ext in enumerate(dict.fromkeys(RESOLVE_EXTENSION_ORDER + list(self.SUPPORTED_EXTENSIONS)))}
+        if collect_files:
+            self._collect_files()
 
     def _collect_files(self):
-        for root, _, files in os.walk(self.repo_path):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in self.SUPPORTED_EXTENSIONS:
-                    abs_path = os.path.join(root, file)
-                    self.files_by_extension[ext].append(abs_path)
-
-    def group_files_by_dependencies(self) -> Tuple[List[Set[str]], Dict[str, Dict]]:
-        graph = self._build_dependency_graph()
-        visited = set()
-        groups = []
-        file_details = {}
-        
-        for file_path in graph:
-            file_details[file_path] = self._analyze_file_contents(file_path)
-        
-        for node in graph:
-            if node not in visited:
-                group = set()
-                queue = deque([node])
-                while queue:
-                    current = queue.popleft()
-                    if current in visited:
+        """Собирает исходники без игнорируемых каталогов, слишком больших, бинарных и минифицированных файлов"""
+        if self._source is not None:
+            self._collect_blobs()
+            return
+        walker = RepositoryWalker(self.repo_path, self.ignore_patterns, self.max_file_bytes)
+        for rel_path, abs_path in walker.walk():
+            file = os.path.basename(rel_path)
+            ext = os.path.splitext(file)[1].lower()
+            if ext in self.SUPPORTED_EXTENSIONS and not is_generated_file(abs_path):
+                self.files_by_extension[ext].append(abs_path)
+            if file in PROJECT_MARKERS:
+                self.project_markers.append(os.path.relpath(abs_path, self.repo_path))
+        self._build_file_index()
+
+    def _collect_blobs(self):
+        """Сбор файлов из дерева ревизии. Блоб с тем же SHA, что в хранилище, уже проходил проверку
+        на бинарность и не читается вовсе; новые блобы читаются один раз и ждут разбора в памяти"""
+        for rel_path, object_id in self._source.walk(self.ignore_patterns, self.max_file_bytes):
+            file = os.path.basename(rel_path)
+            ext = os.path.splitext(file)[1].lower()
+            if ext in self.SUPPORTED_EXTENSIONS:
+                entry = self._store.get(rel_path) if self._store is not None else None
+                if entry is None or entry["hash"] != object_id:
+                    raw = self._source.read(rel_path)
+                    if raw is None or is_generated_content(rel_path, raw):
                         continue
-                    visited.add(current)
-                    group.add(current)
-                    queue.extend(graph[current] - visited)
-                groups.append(group)
+                    self._blobs[rel_path] = raw
+                self.files_by_extension[ext].append(os.path.join(self.repo_path, rel_path))
+            if file in PROJECT_MARKERS:
+                self.project_markers.append(rel_path)
+        self._build_file_index()
+
+    def _build_file_index(self):
+        """Строит индексы путей, по которым зависимости разрешаются без обращений к файловой системе"""
+        self._file_index = self._build_relative_path_map()
+        self._stem_index.clear()
+        self._dir_index.clear()
+        
+        for rel_path in self._file_index:
+            stem = os.path.splitext(rel_path)[0]
+            rank = self._extension_rank(rel_path)
+            
+            current = self._stem_index.get(stem)
+            if current is None or rank < self._extension_rank(current):
+                self._stem_index[stem] = rel_path
+            
+            if os.path.basename(stem) == "index":
+                dir_path = os.path.dirname(stem)
+                current = self._dir_index.get(dir_path)
+                if current is None or rank < self._extension_rank(current):
+                    self._dir_index[dir_path] = rel_path
+        
+        self._module_index = ModuleIndex(self._file_index, self.project_markers, self._read_marker)
+        self._resolve_cache.clear()
+    
+    def _read_marker(self, rel_path: str) -> Optional[str]:
+        if self._source is not None:
+            raw = self._source.read(rel_path)
+            return raw.decode("utf-8", errors="ignore") if raw is not None else None
+        try:
+            with open(os.path.join(self.repo_path, rel_path), "r", encoding="utf-8", errors="ignore") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def group_files_by_dependencies(self, generate_reports: bool = True, save_store: bool = True) -> Tuple[List[Set[str]], Dict[str, Dict]]:
+        """`save_store=False` - результаты не пишутся в хранилище сразу: вызывающий сохраняет их через
+        `save_store`, когда построенное по ним (документация) готово"""
+        file_paths = list(self._file_index)
+        file_ids = {file_path: i for i, file_path in enumerate(file_paths)}
+        components = DisjointSet(len(file_paths))
         
-        self._generate_group_reports(groups, file_details, graph)
+        for file_path, rel_dep in self._link_files():
+            components.union(file_ids[file_path], file_ids[rel_dep])
+        
+        if self._store is not None and save_store:
+            self.save_store()
+        
+        groups = [{file_paths[i] for i in members} for members in components.groups()]
+        file_details = {file_path: self._analyze_file_contents(file_path) for file_path in file_paths}
+        
+        if generate_reports:
+            self._generate_group_reports(groups, file_details, self._build_dependency_graph())
         
         return groups, file_details
     
@@ -159,30 +253,123 @@ class DependencyAnalyzer:
                     
                     f.write("\n" + "="*50 + "\n")
 
-    def _build_dependency_graph(self) -> Dict[str, Set[str]]:
-        graph: Dict[str, Set[str]] = defaultdict(set)
-        file_map = self._build_relative_path_map()
+    def _link_files(self):
+        """Разбирает файлы и отдает найденные ребра зависимостей (файл, зависимость) по мере разрешения"""
+        unchanged = self._restore_from_store()
+        self._parse_all_files(list(self._file_index))
+        self._resolved_deps = {}
+
+        for rel_file in self._file_index:
+            if rel_file in unchanged:
+                self._resolved_deps[rel_file] = set(self._store.get(rel_file)["deps"])
+                for rel_dep in self._resolved_deps[rel_file]:
+                    yield rel_file, rel_dep
+                continue
+
+            resolved = self._resolved_deps[rel_file] = set()
+
+            record = self._load_file(rel_file)
+            if record is None:
+                continue
+
+            for dep in record["imports"]:
+                for rel_dep in self._resolve_dependency(rel_file, dep):
+                    if rel_dep in self._file_index and rel_dep != rel_file and rel_dep not in resolved:
+                        resolved.add(rel_dep)
+                        yield rel_file, rel_dep
+
+    def _index_key(self) -> str:
+        """Отпечаток всего, от чего зависит разрешение импортов: набор файлов и содержимое манифестов"""
+        manifests = sorted(self.project_markers) + sorted(path for path in self._file_index if os.path.basename(path) == 'package.json')
+        parts = sorted(self._file_index)
+        for rel_path in manifests:
+            parts.append(f"{rel_path}:{content_hash((self._read_marker(rel_path) or '').encode('utf-8'))}")
+        return content_hash("\0".join(parts).encode("utf-8"))
+
+    def _restore_from_store(self) -> Set[str]:
+        """Берет из хранилища записи файлов с тем же содержимым, измененные файлы разбирает заново.
+
+        Возвращает файлы, чьи сохраненные ребра остаются верными: это возможно, только если
+        набор файлов и манифесты не менялись, иначе импорты разрешаются заново (по индексу это дешево).
+        """
+        if self._store is None or not self._store.entries:
+            return set()
+        
+        unchanged = set()
+        for rel_path, abs_path in self._file_index.items():
+            entry = self._store.get(rel_path)
+            if entry is None or rel_path in self._file_cache:
+                continue
+            mtime = self._stored_mtime(rel_path, abs_path, entry)
+            if mtime is None:
+                continue
+            
+            self._file_cache[rel_path] = {
+                "content": None,
+                "ext": os.path.splitext(rel_path)[1].lower(),
+                "size": entry["size"],
+                "mtime": mtime,
+                "hash": entry["hash"],
+                "imports": set(entry["imports"]),
+                "analysis": entry["analysis"]
+            }
+            unchanged.add(rel_path)
+        
+        return unchanged if self._store.index_key == self._index_key() else set()
 
-        for ext, files in self.files_by_extension.items():
-            for file_path in files:
-                rel_file = os.path.relpath(file_path, self.repo_path)
-                graph[rel_file]
+    def _stored_mtime(self, rel_path: str, abs_path: str, entry: Dict) -> Optional[int]:
+        """mtime файла, если его содержимое совпадает с записью хранилища, иначе None (измененный файл разбирается сразу)"""
+        if self._source is not None:
+            # SHA блоба - готовый отпечаток содержимого: сравнение без чтения файла
+            return 0 if self._source.blob_id(rel_path) == entry["hash"] else None
+        try:
+            stat = os.stat(abs_path)
+            if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime"]:
+                with open(abs_path, "rb") as f:
+                    raw = f.read()
+                if content_hash(raw) != entry["hash"]:
+                    self._file_cache[rel_path] = self._build_record(rel_path, raw, stat.st_mtime_ns)
+                    return None
+        except OSError:
+            return None
+        return stat.st_mtime_ns
+
+    def store_entries(self) -> Dict[str, Dict]:
+        """Записи хранилища для текущего состояния репозитория (после группировки)"""
+        entries = {}
+        for rel_path in self._file_index:
+            record = self._file_cache.get(rel_path)
+            if record is None:
+                continue
+            entries[rel_path] = {
+                "hash": record["hash"],
+                "size": record["size"],
+                "mtime": record["mtime"],
+                "imports": sorted(record["imports"]),
+                "analysis": record["analysis"],
+                "deps": sorted(self._resolved_deps.get(rel_path, ()))
+            }
+        return entries
 
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                except Exception:
-                    continue
-
-                dependencies = self._extract_dependencies(content, ext)
-                for dep in dependencies:
-                    dep_path = self._resolve_dependency(file_path, dep)
-                    if not dep_path:
-                        continue
-                    rel_dep = os.path.relpath(dep_path, self.repo_path)
-                    if rel_dep in file_map:
-                        graph[rel_file].add(rel_dep)
-                        graph[rel_dep].add(rel_file)
+    def save_store(self, exclude: Iterable[str] = ()):
+        """Сохраняет анализ в хранилище. Файлы из `exclude` туда не попадают: следующий анализ
+        считает их измененными"""
+        entries = self.store_entries()
+        for rel_path in exclude:
+            entries.pop(rel_path, None)
+        self._store.save(entries, self._index_key())
+
+    def _build_dependency_graph(self) -> Dict[str, Set[str]]:
+        """Строит двунаправленный граф смежности; нужен только отчетам, группировка обходится без него"""
+        if not self._resolved_deps:
+            for _ in self._link_files():
+                pass
+
+        graph: Dict[str, Set[str]] = {rel_file: set() for rel_file in self._file_index}
+        for rel_file, deps in self._resolved_deps.items():
+            for rel_dep in deps:
+                graph[rel_file].add(rel_dep)
+                graph[rel_dep].add(rel_file)
 
         return graph
 
@@ -194,46 +381,53 @@ class DependencyAnalyzer:
                 file_map[rel_path] = abs_path
         return file_map
 
-    def _resolve_dependency(self, current_file: str, dep: str) -> Optional[str]:
+    def _resolve_dependency(self, current_file: str, dep: str) -> List[str]:
+        """Разрешает зависимость файла (путь относительно репозитория) по индексу, результат кэшируется"""
         base_dir = os.path.dirname(current_file)
+        resolver = self._resolvers.get(os.path.splitext(current_file)[1].lower())
+        context = resolver.context_key(current_file) if resolver else base_dir
+        key = (context, dep)
+        
+        if key not in self._resolve_cache:
+            path = self._lookup_dependency(base_dir, dep)
+            if path:
+                self._resolve_cache[key] = [path]
+            elif resolver and self._module_index is not None:
+                self._resolve_cache[key] = resolver.resolve(self._module_index, current_file, dep)
+            else:
+                self._resolve_cache[key] = []
+        # Кэш общий для файлов одного каталога (пакета), ребро файла на самого себя отбрасывается после него
+        return [path for path in self._resolve_cache[key] if path != current_file]
+    
+    def _lookup_dependency(self, base_dir: str, dep: str) -> Optional[str]:
+        target = os.path.normpath(os.path.join(base_dir, dep))
         
-        # Попробуем разрешить как относительный путь
-        possible_paths = [
-            os.path.normpath(os.path.join(base_dir, dep)),
-            os.path.normpath(os.path.join(base_dir, dep + '.js')),
-            os.path.normpath(os.path.join(base_dir, dep, 'index.js')),
-            os.path.normpath(os.path.join(base_dir, dep + '.ts')),
-            os.path.normpath(os.path.join(base_dir, dep, 'index.ts')),
-            os.path.normpath(os.path.join(base_dir, dep + '.mjs')),
-            os.path.normpath(os.path.join(base_dir, dep + '.cjs')),
-        ]
-        
-        # Добавим пути для других языков
-        for ext in self.SUPPORTED_EXTENSIONS:
-            possible_paths.append(os.path.normpath(os.path.join(base_dir, dep + ext)))
-            possible_paths.append(os.path.normpath(os.path.join(base_dir, dep, 'index' + ext)))
-        
-        # Проверим все возможные пути
-        for path in possible_paths:
-            if os.path.isfile(path):
-                return path
+        # Попробуем разрешить как относительный путь, затем как путь без расширения или каталог с index.*
+        if target in self._file_index:
+            return target
+        
+        candidates = [path for path in (self._stem_index.get(target), self._dir_index.get(target)) if path]
+        if candidates:
+            return min(candidates, key=lambda path: self._extension_rank(path))
         
         # Попробуем найти в node_modules
         if '/' not in dep and '\\' not in dep:
-            node_modules_path = os.path.join(base_dir, 'node_modules', dep)
+            node_modules_path = os.path.normpath(os.path.join(base_dir, 'node_modules', dep))
             package_json_path = os.path.join(node_modules_path, 'package.json')
-            if os.path.exists(package_json_path):
+            if package_json_path in self._file_index:
                 try:
                     import json
-                    with open(package_json_path, 'r', encoding='utf-8') as f:
-                        package_data = json.load(f)
+                    package_data = json.loads(self.get_file_content(package_json_path) or "{}")
                     main_file = package_data.get('main', 'index.js')
-                    return os.path.join(node_modules_path, main_file)
+                    return os.path.normpath(os.path.join(node_modules_path, main_file))
                 except:
                     pass
         
         return None
     
+    def _extension_rank(self, rel_path: str) -> int:
+        return self._ext_rank.get(os.path.splitext(rel_path)[1].lower(), len(self._ext_rank))
+    
     def _extract_dependencies(self, content: str, ext: str) -> Set[str]:
         if ext == ".py":
             return self._parse_python(content)
@@ -288,29 +482,118 @@ class DependencyAnalyzer:
         else:
             return set()
     
-    def _analyze_file_contents(self, file_path: str) -> Dict:
-        """Анализирует содержимое файла и возвращает структурированную информацию"""
-        abs_path = os.path.join(self.repo_path, file_path)
-        if not os.path.exists(abs_path):
-            return {}
+    def _parse_all_files(self, file_paths: List[str]):
+        """Разбирает все еще не разобранные файлы: в пуле процессов для больших репозиториев, иначе последовательно"""
+        pending = [path for path in file_paths if path not in self._file_cache]
+        if not pending:
+            return
+        
+        if self.workers < 2 or len(pending) < self.PARALLEL_MIN_FILES:
+            for file_path in pending:
+                self._load_file(file_path)
+            return
+        
+        chunk_count = self.workers * self.CHUNKS_PER_WORKER
+        chunks = [pending[i::chunk_count] for i in range(chunk_count) if pending[i::chunk_count]]
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            if self._source is not None:
+                # Воркеры пула не видят cat-file родителя: блобы передаются им вместе с путями
+                futures = [
+                    executor.submit(_parse_blobs_chunk, self.repo_path, [
+                        (path, self._take_blob(path), self._source.blob_id(path)) for path in chunk
+                    ])
+                    for chunk in chunks
+                ]
+            else:
+                futures = [
+                    executor.submit(_parse_files_chunk, self.repo_path, chunk)
+                    for chunk in chunks
+                ]
+            for future in futures:
+                for file_path, record in future.result():
+                    if record is not None:
+                        self._file_cache[file_path] = record
+    
+    def _parse_file(self, file_path: str) -> Optional[Dict]:
+        """Читает файл и извлекает из него зависимости и структуру кода"""
+        if self._source is not None:
+            raw = self._take_blob(file_path)
+            if raw is None:
+                return None
+            return self._build_record(file_path, raw, 0, self._source.blob_id(file_path))
         
+        abs_path = os.path.join(self.repo_path, file_path)
         try:
-            with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-        except Exception:
-            return {}
+            with open(abs_path, "rb") as f:
+                raw = f.read()
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+        except OSError:
+            return None
         
+        return self._build_record(file_path, raw, mtime)
+    
+    def _take_blob(self, file_path: str) -> Optional[bytes]:
+        """Содержимое блоба, прочитанное при сборе файлов, иначе чтение через cat-file"""
+        raw = self._blobs.pop(file_path, None)
+        return raw if raw is not None else self._source.read(file_path)
+    
+    def _build_record(self, file_path: str, raw: bytes, mtime: int, digest: Optional[str] = None) -> Dict:
+        """`digest` - готовый отпечаток содержимого (SHA блоба), иначе хэш считается по `raw`"""
         ext = os.path.splitext(file_path)[1].lower()
-        language = self.SUPPORTED_EXTENSIONS.get(ext, "Unknown")
+        content = raw.decode("utf-8", errors="ignore")
+        return {
+            "content": content,
+            "ext": ext,
+            "size": len(raw),
+            "mtime": mtime,
+            "hash": digest or content_hash(raw),
+            "imports": self._extract_dependencies(content, ext),
+            "analysis": self._analyze_code_structure(content, ext)
+        }
+    
+    def _load_file(self, file_path: str) -> Optional[Dict]:
+        """Читает и разбирает файл один раз за прогон, повторные вызовы берут запись из кэша"""
+        record = self._file_cache.get(file_path)
+        if record is None:
+            record = self._parse_file(file_path)
+            if record is not None:
+                self._file_cache[file_path] = record
+        return record
+    
+    def get_file_content(self, file_path: str) -> Optional[str]:
+        """Возвращает прочитанное при анализе содержимое файла (путь относительно репозитория)"""
+        record = self._load_file(file_path)
+        if record is None:
+            return None
+        if record["content"] is not None:
+            return record["content"]
+        
+        # Записи неизмененных файлов восстанавливаются из хранилища анализа без содержимого
+        if self._source is not None:
+            raw = self._source.read(file_path)
+            return raw.decode("utf-8", errors="ignore") if raw is not None else None
+        try:
+            with open(os.path.join(self.repo_path, file_path), "r", encoding="utf-8", errors="ignore") as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _analyze_file_contents(self, file_path: str) -> Dict:
+        """Анализирует содержимое файла и возвращает структурированную информацию"""
+        record = self._load_file(file_path)
+        if record is None:
+            return {}
         
+        ext = record["ext"]
         analysis = {
             "path": file_path,
-            "language": language,
-            "size": os.path.getsize(abs_path),
+            "language": self.SUPPORTED_EXTENSIONS.get(ext, "Unknown"),
+            "size": record["size"],
             "functions": [],
             "classes": [],
-            "imports": list(self._extract_dependencies(content, ext)),
-            "analysis": self._analyze_code_structure(content, ext)
+            "imports": list(record["imports"]),
+            "analysis": record["analysis"]
         }
         
         return analysis
@@ -355,7 +638,9 @@ class DependencyAnalyzer:
     # -------- Анализаторы функций ---------
     
     def _analyze_python_structure(self, content: str) -> Dict:
-        """Анализирует структуру Python файла"""
+        """Анализирует структуру Python файла. AST строится только при генерации и только для файлов,
+        которые режутся на фрагменты (doc_generator.build_structure): для всего репозитория он в разы дороже"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": [],
@@ -363,26 +648,27 @@ class DependencyAnalyzer:
         }
         
         # Поиск функций
-        func_matches = re.finditer(r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["python"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
         
         # Поиск классов
-        class_matches = re.finditer(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["python"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
         
         return analysis
     
     def _analyze_javascript_structure(self, content: str) -> Dict:
         """Анализирует структуру JavaScript/TypeScript файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": [],
@@ -390,30 +676,29 @@ class DependencyAnalyzer:
         }
 
         # Функции: function имя(...) или const имя = (...) => { ... }
-        func_matches = re.finditer(
-            r'(?:function\s+([a-zA-Z0-9_]+)\s*\(([^)]*)\))|(?:const\s+([a-zA-Z0-9_]+)\s*=\s*\(([^)]*)\)\s*=>)',
-            content)
+        func_matches = PATTERNS["javascript"]["functions"].finditer(content)
         for match in func_matches:
             name = match.group(1) or match.group(3)
             params = match.group(2) or match.group(4) or ''
             analysis["functions"].append({
                 "name": name,
                 "params": [p.strip() for p in params.split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["javascript"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_cpp_structure(self, content: str) -> Dict:
         """Анализирует структуру C++ файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": [],
@@ -421,27 +706,27 @@ class DependencyAnalyzer:
         }
 
         # Функции: возвращаемый_тип имя(параметры) { ... }
-        func_matches = re.finditer(r'([a-zA-Z_][a-zA-Z0-9_:<>]*)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)\s*\{',
-                                content)
+        func_matches = PATTERNS["cpp"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(2),
                 "params": [p.strip() for p in match.group(3).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["cpp"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_csharp_structure(self, content: str) -> Dict:
         """Анализирует структуру C# файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": [],
@@ -449,27 +734,27 @@ class DependencyAnalyzer:
         }
 
         # Методы: тип имя(параметры)
-        func_matches = re.finditer(r'\b(?:public|private|protected|internal|static|\s)*\s*([a-zA-Z0-9_<>,\[\]]+)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)',
-                                content)
+        func_matches = PATTERNS["csharp"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(2),
                 "params": [p.strip() for p in match.group(3).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["csharp"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
     
     def _analyze_java_structure(self, content: str) -> Dict:
         """Анализирует структуру Java файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": [],
@@ -477,27 +762,27 @@ class DependencyAnalyzer:
         }
 
         # Методы
-        func_matches = re.finditer(r'\b(?:public|private|protected|static|\s)*\s*([a-zA-Z0-9_<>,\[\]]+)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)',
-                                content)
+        func_matches = PATTERNS["java"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(2),
                 "params": [p.strip() for p in match.group(3).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["java"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_go_structure(self, content: str) -> Dict:
         """Анализирует структуру Go файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "structs": [],
@@ -505,34 +790,27 @@ class DependencyAnalyzer:
         }
 
         # Функции
-        func_matches = re.finditer(r'func\s+(?:\([^)]*\)\s*)?([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["go"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
-            })
-
-        # Структуры
-        struct_matches = re.finditer(r'type\s+([a-zA-Z_][a-zA-Z0-9_]*)\s+struct', content)
-        for match in struct_matches:
-            analysis["structs"].append({
-                "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
-        # Интерфейсы
-        interface_matches = re.finditer(r'type\s+([a-zA-Z_][a-zA-Z0-9_]*)\s+interface', content)
-        for match in interface_matches:
-            analysis["interfaces"].append({
+        # Структуры и интерфейсы
+        type_matches = PATTERNS["go"]["types"].finditer(content)
+        for match in type_matches:
+            analysis[match.group(2) + "s"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_rust_structure(self, content: str) -> Dict:
         """Анализирует структуру Rust файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": [],
@@ -540,34 +818,35 @@ class DependencyAnalyzer:
         }
 
         # Функции
-        func_matches = re.finditer(r'\bfn\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["rust"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Структуры
-        struct_matches = re.finditer(r'\bstruct\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        struct_matches = PATTERNS["rust"]["structs"].finditer(content)
         for match in struct_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Энумы
-        enum_matches = re.finditer(r'\benum\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        enum_matches = PATTERNS["rust"]["enums"].finditer(content)
         for match in enum_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
     
     def _analyze_svelte_structure(self, content: str) -> Dict:
         """Анализирует структуру Svelte компонента"""
+        lines = LineIndex(content)
         analysis = {
             "script": {
                 "variables": [],
@@ -584,80 +863,84 @@ class DependencyAnalyzer:
         }
 
         # Анализ script секции
-        script_match = re.search(r'<script[^>]*>([\s\S]*?)<\/script>', content)
+        script_match = PATTERNS["sfc"]["script"].search(content)
         if script_match:
             script_content = script_match.group(1)
+            script_lines = LineIndex(script_content)
             # Импорты
             analysis["script"]["imports"] = list(self._parse_javascript(script_content))
             # Переменные
             analysis["script"]["variables"] = [
-                {"name": m.group(1), "line": script_content[:m.start()].count('\n') + 1}
-                for m in re.finditer(r'let\s+([a-zA-Z_][a-zA-Z0-9_]*)', script_content)
+                {"name": m.group(1), "line": script_lines.line_of(m.start())}
+                for m in PATTERNS["svelte"]["variables"].finditer(script_content)
             ]
             # Функции
             analysis["script"]["functions"] = [
                 {
                     "name": m.group(1),
                     "params": [p.strip() for p in m.group(2).split(',') if p.strip()],
-                    "line": script_content[:m.start()].count('\n') + 1
+                    "line": script_lines.line_of(m.start())
                 }
-                for m in re.finditer(r'function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', script_content)
+                for m in PATTERNS["svelte"]["functions"].finditer(script_content)
             ]
 
         # Анализ markup секции
-        markup_match = re.search(r'<[^>]+>', content)
+        markup_match = PATTERNS["sfc"]["tag"].search(content)
         if markup_match:
             # Компоненты (теги с заглавной буквы)
             analysis["markup"]["components"] = [
-                {"name": m.group(1), "line": content[:m.start()].count('\n') + 1}
-                for m in re.finditer(r'<([A-Z][a-zA-Z0-9]*)', content)
+                {"name": m.group(1), "line": lines.line_of(m.start())}
+                for m in PATTERNS["svelte"]["components"].finditer(content)
             ]
             # HTML элементы
             analysis["markup"]["elements"] = [
-                {"name": m.group(1), "line": content[:m.start()].count('\n') + 1}
-                for m in re.finditer(r'<([a-z][a-zA-Z0-9-]*)', content)
+                {"name": m.group(1), "line": lines.line_of(m.start())}
+                for m in PATTERNS["svelte"]["elements"].finditer(content)
             ]
 
         # Анализ style секции
-        style_match = re.search(r'<style[^>]*>([\s\S]*?)<\/style>', content)
+        style_match = PATTERNS["sfc"]["style"].search(content)
         if style_match:
             style_content = style_match.group(1)
+            style_lines = LineIndex(style_content)
             # CSS правила
             analysis["style"]["rules"] = [
-                {"selector": m.group(1).strip(), "line": style_content[:m.start()].count('\n') + 1}
-                for m in re.finditer(r'([^{]+)\s*\{', style_content)
+                {"selector": m.group(1).strip(), "line": style_lines.line_of(m.start())}
+                for m in PATTERNS["svelte"]["rules"].finditer(style_content)
             ]
 
         return analysis
     
     def _analyze_kotlin_structure(self, content: str) -> Dict:
         """Анализирует структуру Kotlin файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": []
         }
 
         # Функции
-        func_matches = re.finditer(r'\bfun\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["kotlin"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["kotlin"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_swift_structure(self, content: str) -> Dict:
         """Анализирует структуру Swift файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": [],
@@ -667,76 +950,78 @@ class DependencyAnalyzer:
         }
 
         # Функции
-        func_matches = re.finditer(r'\bfunc\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["swift"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["swift"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Структуры
-        struct_matches = re.finditer(r'\bstruct\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        struct_matches = PATTERNS["swift"]["structs"].finditer(content)
         for match in struct_matches:
             analysis["structs"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Энумы
-        enum_matches = re.finditer(r'\benum\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        enum_matches = PATTERNS["swift"]["enums"].finditer(content)
         for match in enum_matches:
             analysis["enums"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Протоколы
-        protocol_matches = re.finditer(r'\bprotocol\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        protocol_matches = PATTERNS["swift"]["protocols"].finditer(content)
         for match in protocol_matches:
             analysis["protocols"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_dart_structure(self, content: str) -> Dict:
         """Анализирует структуру Dart файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": []
         }
 
         # Функции
-        func_matches = re.finditer(r'\b(?:void|int|double|String|bool|var|dynamic|const|final)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["dart"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["dart"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_ruby_structure(self, content: str) -> Dict:
         """Анализирует структуру Ruby файла"""
+        lines = LineIndex(content)
         analysis = {
             "methods": [],
             "classes": [],
@@ -744,60 +1029,62 @@ class DependencyAnalyzer:
         }
 
         # Методы
-        method_matches = re.finditer(r'\bdef\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(?([^)]*)\)?', content)
+        method_matches = PATTERNS["ruby"]["methods"].finditer(content)
         for match in method_matches:
             analysis["methods"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["ruby"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Модули
-        module_matches = re.finditer(r'\bmodule\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        module_matches = PATTERNS["ruby"]["modules"].finditer(content)
         for match in module_matches:
             analysis["modules"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_php_structure(self, content: str) -> Dict:
         """Анализирует структуру PHP файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "classes": []
         }
 
         # Функции
-        func_matches = re.finditer(r'\bfunction\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["php"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["php"]["classes"].finditer(content)
         for match in class_matches:
             analysis["classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_haskell_structure(self, content: str) -> Dict:
         """Анализирует структуру Haskell файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "data_types": [],
@@ -805,60 +1092,62 @@ class DependencyAnalyzer:
         }
 
         # Функции
-        func_matches = re.finditer(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*::\s*([^=]+)=', content)
+        func_matches = PATTERNS["haskell"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "type": match.group(2).strip(),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Типы данных
-        data_matches = re.finditer(r'\bdata\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        data_matches = PATTERNS["haskell"]["data_types"].finditer(content)
         for match in data_matches:
             analysis["data_types"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Классы типов
-        class_matches = re.finditer(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+        class_matches = PATTERNS["haskell"]["classes"].finditer(content)
         for match in class_matches:
             analysis["type_classes"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_lua_structure(self, content: str) -> Dict:
         """Анализирует структуру Lua файла"""
+        lines = LineIndex(content)
         analysis = {
             "functions": [],
             "tables": []
         }
 
         # Функции
-        func_matches = re.finditer(r'\bfunction\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', content)
+        func_matches = PATTERNS["lua"]["functions"].finditer(content)
         for match in func_matches:
             analysis["functions"].append({
                 "name": match.group(1),
                 "params": [p.strip() for p in match.group(2).split(',') if p.strip()],
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         # Таблицы
-        table_matches = re.finditer(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\{', content)
+        table_matches = PATTERNS["lua"]["tables"].finditer(content)
         for match in table_matches:
             analysis["tables"].append({
                 "name": match.group(1),
-                "line": content[:match.start()].count('\n') + 1
+                "line": lines.line_of(match.start())
             })
 
         return analysis
 
     def _analyze_vue_structure(self, content: str) -> Dict:
         """Анализирует структуру Vue файла"""
+        lines = LineIndex(content)
         analysis = {
             "components": [],
             "methods": [],
@@ -868,24 +1157,24 @@ class DependencyAnalyzer:
         }
 
         # Компоненты
-        component_matches = re.finditer(r'components:\s*\{([^}]+)\}', content)
+        component_matches = PATTERNS["vue"]["components"].finditer(content)
         for match in component_matches:
-            component_names = re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)', match.group(1))
+            component_names = PATTERNS["vue"]["identifiers"].findall(match.group(1))
             for name in component_names:
                 analysis["components"].append({
                     "name": name,
-                    "line": content[:match.start()].count('\n') + 1
+                    "line": lines.line_of(match.start())
                 })
 
         # Методы
-        method_matches = re.finditer(r'methods:\s*\{([^}]+)\}', content)
+        method_matches = PATTERNS["vue"]["methods"].finditer(content)
         for match in method_matches:
-            method_defs = re.finditer(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)', match.group(1))
+            method_defs = PATTERNS["vue"]["method_defs"].finditer(match.group(1))
             for m in method_defs:
                 analysis["methods"].append({
                     "name": m.group(1),
                     "params": [p.strip() for p in m.group(2).split(',') if p.strip()],
-                    "line": content[:match.start()].count('\n') + 1
+                    "line": lines.line_of(match.start())
                 })
 
         return analysis
@@ -894,16 +1183,16 @@ class DependencyAnalyzer:
 
     def _parse_python(self, content: str) -> Set[str]:
         deps = set()
-        from_imports = re.findall(r'from\s+([a-zA-Z0-9_.]+)\s+import', content)
-        direct_imports = re.findall(r'^\s*import\s+([a-zA-Z0-9_.]+)', content, re.MULTILINE)
-        all_imports = from_imports + direct_imports
+        from_imports = PATTERNS["python"]["from_imports"].findall(content)
+        direct_imports = PATTERNS["python"]["direct_imports"].findall(content)
+        all_imports = [imp for imp, _ in from_imports] + direct_imports
 
         for imp in all_imports:
             parts = imp.split(".")
             if parts:
                 deps.add(os.path.join(*parts) + ".py")
 
-        wildcard_imports = re.findall(r'from\s+([a-zA-Z0-9_.]+)\s+import\s+\*', content)
+        wildcard_imports = [imp for imp, wildcard in from_imports if wildcard]
         for imp in wildcard_imports:
             parts = imp.split(".")
             if parts:
@@ -913,10 +1202,10 @@ class DependencyAnalyzer:
 
     def _parse_html(self, content: str) -> Set[str]:
         deps = set()
-        scripts = re.findall(r'<script.*?src=["\'](.+?)["\']', content)
-        links = re.findall(r'<link.*?href=["\'](.+?)["\']', content)
-        images = re.findall(r'<img.*?src=["\'](.+?)["\']', content)
-        anchors = re.findall(r'<a.*?href=["\'](.+?)["\']', content)
+        scripts = PATTERNS["html"]["scripts"].findall(content)
+        links = PATTERNS["html"]["links"].findall(content)
+        images = PATTERNS["html"]["images"].findall(content)
+        anchors = PATTERNS["html"]["anchors"].findall(content)
         
         deps.update(scripts)
         deps.update(links)
@@ -926,8 +1215,8 @@ class DependencyAnalyzer:
     
     def _parse_css(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'@import\s+(?:url\()?["\'](.+?)["\']\)?', content)
-        urls = re.findall(r'url\(["\']?(.+?)["\']?\)', content)
+        imports = PATTERNS["css"]["imports"].findall(content)
+        urls = PATTERNS["css"]["urls"].findall(content)
         
         deps.update(imports)
         deps.update(urls)
@@ -936,19 +1225,19 @@ class DependencyAnalyzer:
     def _parse_vue(self, content: str) -> Set[str]:
         deps = set()
         # Импорты в script секции
-        script_matches = re.search(r'<script[^>]*>([\s\S]*?)<\/script>', content)
+        script_matches = PATTERNS["sfc"]["script"].search(content)
         if script_matches:
             script_content = script_matches.group(1)
             deps.update(self._parse_javascript(script_content))
         
         # Импорты в template секции
-        template_matches = re.search(r'<template[^>]*>([\s\S]*?)<\/template>', content)
+        template_matches = PATTERNS["sfc"]["template"].search(content)
         if template_matches:
             template_content = template_matches.group(1)
             deps.update(self._parse_html(template_content))
         
         # Импорты в style секции
-        style_matches = re.findall(r'<style[^>]*>([\s\S]*?)<\/style>', content)
+        style_matches = PATTERNS["sfc"]["style"].findall(content)
         for style_content in style_matches:
             deps.update(self._parse_css(style_content))
         
@@ -957,28 +1246,28 @@ class DependencyAnalyzer:
     def _parse_svelte(self, content: str) -> Set[str]:
         deps = set()
         # Импорты в script секции
-        script_matches = re.search(r'<script[^>]*>([\s\S]*?)<\/script>', content)
+        script_matches = PATTERNS["sfc"]["script"].search(content)
         if script_matches:
             script_content = script_matches.group(1)
             deps.update(self._parse_javascript(script_content))
         
         # HTML-подобные зависимости
-        html_matches = re.search(r'<[^>]+>', content)
+        html_matches = PATTERNS["sfc"]["tag"].search(content)
         if html_matches:
             deps.update(self._parse_html(html_matches.group(0)))
         
         return deps
 
     def _parse_cpp(self, content: str) -> Set[str]:
-        return set(re.findall(r'#include\s+[<"](.+?)[>"]', content))
+        return set(PATTERNS["cpp"]["includes"].findall(content))
 
     def _parse_csharp(self, content: str) -> Set[str]:
         deps = set()
         
-        usings = re.findall(r'using\s+([a-zA-Z0-9_.]+);', content)
+        usings = PATTERNS["csharp"]["usings"].findall(content)
         deps.update(usings)
         
-        assemblies = re.findall(r'\[assembly:\s*[^\]]+\s*\(\s*@"([^"]+)"\s*\)\s*\]', content)
+        assemblies = PATTERNS["csharp"]["assemblies"].findall(content)
         deps.update(assemblies)
         
         return deps
@@ -986,10 +1275,10 @@ class DependencyAnalyzer:
     def _parse_java(self, content: str) -> Set[str]:
         deps = set()
 
-        imports = re.findall(r'import\s+(?:static\s+)?([a-zA-Z0-9_.]+)\s*;', content)
+        imports = PATTERNS["java"]["imports"].findall(content)
         deps.update(imports)
         
-        packages = re.findall(r'package\s+([a-zA-Z0-9_.]+)\s*;', content)
+        packages = PATTERNS["java"]["packages"].findall(content)
         deps.update(packages)
         
         return deps
@@ -997,12 +1286,11 @@ class DependencyAnalyzer:
     def _parse_go(self, content: str) -> Set[str]:
         deps = set()
 
-        imports = re.findall(r'import\s+(?:(?:\w+\s+)?"([^"]+)"', content)
-        deps.update(imports)
-        
+        for single_import, imp_group in PATTERNS["go"]["imports"].findall(content):
+            if single_import:
+                deps.add(single_import)
+                continue
 
-        multiline_imports = re.findall(r'import\s*\(\s*([^)]+)\s*\)', content)
-        for imp_group in multiline_imports:
             lines = [line.strip().strip('"') for line in imp_group.split('\n') if line.strip()]
             deps.update(lines)
         
@@ -1011,12 +1299,12 @@ class DependencyAnalyzer:
     def _parse_rust(self, content: str) -> Set[str]:
         deps = set()
 
-        mod_matches = re.findall(r'\b(?:pub\s+)?mod\s+([a-zA-Z0-9_]+)\s*;', content)
+        mod_matches = PATTERNS["rust"]["mods"].findall(content)
         for mod_name in mod_matches:
             deps.add(f"{mod_name}.rs")
             deps.add(os.path.join(mod_name, "mod.rs"))
 
-        use_matches = re.findall(r'\buse\s+([a-zA-Z0-9_:]+)', content)
+        use_matches = PATTERNS["rust"]["uses"].findall(content)
         for use_path in use_matches:
             segments = use_path.split("::")
 
@@ -1028,41 +1316,41 @@ class DependencyAnalyzer:
 
     def _parse_kotlin(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'import\s+([a-zA-Z0-9_.]+)', content)
+        imports = PATTERNS["kotlin"]["imports"].findall(content)
         deps.update(imports)
         
-        packages = re.findall(r'package\s+([a-zA-Z0-9_.]+)', content)
+        packages = PATTERNS["kotlin"]["packages"].findall(content)
         deps.update(packages)
         
         return deps
 
     def _parse_swift(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'import\s+([a-zA-Z0-9_]+)', content)
+        imports = PATTERNS["swift"]["imports"].findall(content)
         deps.update(imports)
         
         return deps
 
     def _parse_dart(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'import\s+[\'\"]([^\'\"]+)[\'\"]', content)
+        imports = PATTERNS["dart"]["imports"].findall(content)
         deps.update(imports)
         
-        package_imports = re.findall(r'package:([^\'\"\s]+)', content)
+        package_imports = PATTERNS["dart"]["package_imports"].findall(content)
         deps.update(package_imports)
         
         return deps
 
     def _parse_ruby(self, content: str) -> Set[str]:
         deps = set()
-        requires = re.findall(r'require\s+[\'"]([^\'"]+)[\'"]', content)
+        requires = PATTERNS["ruby"]["requires"].findall(content)
         deps.update(requires)
         
-        loads = re.findall(r'load\s+[\'"]([^\'"]+)[\'"]', content)
+        loads = PATTERNS["ruby"]["loads"].findall(content)
         deps.update(loads)
         
 
-        autoloads = re.findall(r'autoload\s+:[A-Za-z0-9_]+\s*,\s*[\'"]([^\'"]+)[\'"]', content)
+        autoloads = PATTERNS["ruby"]["autoloads"].findall(content)
         deps.update(autoloads)
         
         return deps
@@ -1070,64 +1358,64 @@ class DependencyAnalyzer:
     def _parse_php(self, content: str) -> Set[str]:
         deps = set()
 
-        requires = re.findall(r'(?:require|include)(?:_once)?\s*[\'"]([^\'"]+)[\'"]', content)
+        requires = PATTERNS["php"]["requires"].findall(content)
         deps.update(requires)
         
-        uses = re.findall(r'use\s+([a-zA-Z0-9_\\]+)', content)
+        uses = PATTERNS["php"]["uses"].findall(content)
         deps.update(uses)
         
-        autoloads = re.findall(r'spl_autoload_register\s*\(.*?["\']([^"\']+)["\']', content)
+        autoloads = PATTERNS["php"]["autoloads"].findall(content)
         deps.update(autoloads)
         
         return deps
 
     def _parse_haskell(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'import\s+(?:qualified\s+)?([a-zA-Z0-9.]+)', content)
+        imports = PATTERNS["haskell"]["imports"].findall(content)
         deps.update(imports)
         
         return deps
 
     def _parse_lua(self, content: str) -> Set[str]:
         deps = set()
-        requires = re.findall(r'require\s*\(?[\'"]([^\'"]+)[\'"]\)?', content)
+        requires = PATTERNS["lua"]["requires"].findall(content)
         deps.update(requires)
         
         return deps
 
     def _parse_r(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'library\s*\(([^)]+)\)', content)
+        imports = PATTERNS["r"]["imports"].findall(content)
         deps.update(imports)
         
-        sources = re.findall(r'source\s*\(["\']([^"\']+)["\']\)', content)
+        sources = PATTERNS["r"]["sources"].findall(content)
         deps.update(sources)
         
         return deps
 
     def _parse_julia(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'(?:using|import)\s+([a-zA-Z0-9.]+)', content)
+        imports = PATTERNS["julia"]["imports"].findall(content)
         deps.update(imports)
         
-        includes = re.findall(r'include\s*\(["\']([^"\']+)["\']\)', content)
+        includes = PATTERNS["julia"]["includes"].findall(content)
         deps.update(includes)
         
         return deps
 
     def _parse_zig(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'@import\s*\(["\']([^"\']+)["\']\)', content)
+        imports = PATTERNS["zig"]["imports"].findall(content)
         deps.update(imports)
         
         return deps
 
     def _parse_nim(self, content: str) -> Set[str]:
         deps = set()
-        imports = re.findall(r'import\s+([a-zA-Z0-9.]+)', content)
+        imports = PATTERNS["nim"]["imports"].findall(content)
         deps.update(imports)
         
-        includes = re.findall(r'include\s+["\']([^"\']+)["\']', content)
+        includes = PATTERNS["nim"]["includes"].findall(content)
         deps.update(includes)
         
         return deps
@@ -1135,7 +1423,7 @@ class DependencyAnalyzer:
     def _parse_v(self, content: str) -> Set[str]:
         deps = set()
         
-        imports = re.findall(r'import\s+([a-zA-Z0-9.]+)', content)
+        imports = PATTERNS["v"]["imports"].findall(content)
         deps.update(imports)
         
         return deps
@@ -1143,7 +1431,7 @@ class DependencyAnalyzer:
     def _parse_proto(self, content: str) -> Set[str]:
         deps = set()
 
-        imports = re.findall(r'import\s+"([^"]+)"', content)
+        imports = PATTERNS["proto"]["imports"].findall(content)
         deps.update(imports)
         
         return deps
@@ -1152,9 +1440,9 @@ class DependencyAnalyzer:
         """Парсит зависимости в shell-скриптах"""
         deps = set()
         
-        sources = re.findall(r'source\s+["\']?([^"\'\s]+)', content)
-        dots = re.findall(r'\.\s+["\']?([^"\'\s]+)', content)
-        execs = re.findall(r'(?:sh|bash|\./)\s+([^\s&|;]+)', content)
+        sources = PATTERNS["shell"]["sources"].findall(content)
+        dots = PATTERNS["shell"]["dots"].findall(content)
+        execs = PATTERNS["shell"]["execs"].findall(content)
         
         deps.update(sources)
         deps.update(dots)
@@ -1164,10 +1452,10 @@ class DependencyAnalyzer:
     def _parse_javascript(self, content: str) -> Set[str]:
         deps = set()
 
-        imports = re.findall(r'import.*?["\'](.+?)["\']', content)
+        imports = PATTERNS["javascript"]["imports"].findall(content)
         deps.update(imports)
 
-        requires = re.findall(r'require\(["\'](.+?)["\']\)', content)
+        requires = PATTERNS["javascript"]["requires"].findall(content)
         deps.update(requires)
 
         normalized_deps = set()
@@ -1217,12 +1505,13 @@ class DependencyAnalyzer:
         
         print(f"Generated DOT files in {dot_dir}. You can convert them to images using Graphviz.")
 
-    def analyze_repository(self):
+    def analyze_repository(self, generate_reports: bool = True, save_store: bool = True):
         """Полный анализ репозитория с визуализацией"""
-        groups, file_details = self.group_files_by_dependencies()
-        self.generate_visualization(groups, file_details)
+        groups, file_details = self.group_files_by_dependencies(generate_reports, save_store)
         
-        self._generate_summary_report(groups, file_details)
+        if generate_reports:
+            self.generate_visualization(groups, file_details)
+            self._generate_summary_report(groups, file_details)
         
         return groups, file_details
 
@@ -1272,3 +1561,18 @@ class DependencyAnalyzer:
                 lang = file_details.get(file, {}).get("language", "Unknown")
                 f.write(f"- {file} ({lang}, {deps} dependencies)\n")
 
+
+def _parse_files_chunk(repo_path: str, file_paths: List[str]) -> List[Tuple[str, Optional[Dict]]]:
+    """Разбирает часть файлов репозитория в процессе пула. Записи возвращаются с содержимым: копия через pipe
+    дешевле, чем повторное чтение каждого файла с диска при генерации документации"""
+    analyzer = DependencyAnalyzer(repo_path, workers=1, collect_files=False)
+    return [(file_path, analyzer._parse_file(file_path)) for file_path in file_paths]
+
+
+def _parse_blobs_chunk(repo_path: str, blobs: List[Tuple[str, Optional[bytes], str]]) -> List[Tuple[str, Optional[Dict]]]:
+    """То же для блобов git: (путь, содержимое, SHA блоба)"""
+    analyzer = DependencyAnalyzer(repo_path, workers=1, collect_files=False)
+    return [
+        (file_path, analyzer._build_record(file_path, raw, 0, digest=object_id) if raw is not None else None)
+        for file_path, raw, object_id in blobs
+    ]
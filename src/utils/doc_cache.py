@@ -0,0 +1,178 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Вытеснение по размеру освобождает место с запасом до этой доли бюджета, чтобы не запускаться на каждой записи
+EVICT_TO_FRACTION = 0.9
+EVICT_BATCH = 200
+# Удаление устаревших записей - не чаще этого интервала на процесс
+EXPIRE_INTERVAL_SECONDS = 3600
+# Отметки использования и счетчики копятся в памяти и пишутся пачкой: чтение из кэша не берет блокировку записи
+TOUCH_BATCH = 64
+TOUCH_FLUSH_SECONDS = 30
+
+_shared_caches: Dict[Tuple[int, str], "DocCache"] = {}
+
+
+class DocCache:
+    """Кэш ответов модели, адресуемый содержимым: ключ - хэш (фрагмент кода, версия промта, модель, зависимости).
+
+    Хранится в SQLite, общем для всех процессов генерации. Общий размер записей ведется счетчиком
+    в таблице stats; когда он превышает `max_bytes`, вытесняются самые давно использованные записи.
+    Записи старше `max_age_seconds` не отдаются и периодически удаляются.
+    """
+
+    def __init__(self, path: str, max_bytes: int, max_age_seconds: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._pending_counts = {"hits": 0, "misses": 0}
+        self._flushed_at = time.time()
+        self._expired_at = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                "key TEXT PRIMARY KEY, value TEXT, size INTEGER, created_at REAL, last_access REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS docs_last_access ON docs (last_access)")
+            connection.execute("CREATE INDEX IF NOT EXISTS docs_created_at ON docs (created_at)")
+            connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            # Кэш, созданный до счетчика размера, считается один раз
+            connection.execute(
+                "INSERT OR IGNORE INTO stats SELECT 'bytes', COALESCE(SUM(size), 0) FROM docs"
+            )
+
+    @classmethod
+    def shared(cls, path: str, max_bytes: int, max_age_seconds: int) -> "DocCache":
+        """Один кэш на процесс: накопленные отметки не теряются вместе с объектом и пишутся при выходе"""
+        key = (os.getpid(), str(path))
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = cls(path, max_bytes, max_age_seconds)
+            atexit.register(cache.flush)
+        return cache
+
+    def _connect(self) -> sqlite3.Connection:
+        # Пишут несколько процессов пула: WAL и ожидание блокировки вместо ошибки
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    @staticmethod
+    def make_key(chunk: str, prompt_version: str, model: str, dependencies: List[str], outline: str = "") -> str:
+        payload = json.dumps([prompt_version, model, sorted(dependencies), outline, chunk], ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    "SELECT value FROM docs WHERE key = ? AND created_at >= ?", (key, now - self.max_age_seconds)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[!] Doc cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is not None:
+                self._touched[key] = now
+            self._pending_counts["hits" if row is not None else "misses"] += 1
+            due = len(self._touched) >= TOUCH_BATCH or now - self._flushed_at >= TOUCH_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        try:
+            with closing(self._connect()) as connection, connection:
+                previous = connection.execute("SELECT size FROM docs WHERE key = ?", (key,)).fetchone()
+                connection.execute("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)", (key, value, size, now, now))
+                self._add_bytes(connection, size - (previous[0] if previous else 0))
+                self._write_pending(connection)
+                self._evict(connection, now)
+        except sqlite3.Error as e:
+            print(f"[!] Doc cache write failed: {e}")
+
+    def flush(self):
+        """Пишет накопленные отметки использования и счетчики попаданий"""
+        with self._lock:
+            if not self._touched and not any(self._pending_counts.values()):
+                return
+        try:
+            with closing(self._connect()) as connection, connection:
+                self._write_pending(connection)
+        except sqlite3.Error as e:
+            print(f"[!] Doc cache write failed: {e}")
+
+    def _write_pending(self, connection: sqlite3.Connection):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            counts, self._pending_counts = self._pending_counts, {"hits": 0, "misses": 0}
+            self._flushed_at = time.time()
+        connection.executemany("UPDATE docs SET last_access = MAX(last_access, ?) WHERE key = ?",
+                               [(at, key) for key, at in touched.items()])
+        for name, count in counts.items():
+            if count:
+                connection.execute(
+                    "INSERT INTO stats VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, count)
+                )
+
+    def _add_bytes(self, connection: sqlite3.Connection, delta: int):
+        connection.execute("UPDATE stats SET value = value + ? WHERE name = 'bytes'", (delta,))
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        if now - self._expired_at >= EXPIRE_INTERVAL_SECONDS:
+            self._expired_at = now
+            deadline = now - self.max_age_seconds
+            (expired,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM docs WHERE created_at < ?", (deadline,)).fetchone()
+            connection.execute("DELETE FROM docs WHERE created_at < ?", (deadline,))
+            self._add_bytes(connection, -expired)
+
+        (total,) = connection.execute("SELECT value FROM stats WHERE name = 'bytes'").fetchone()
+        # Самые давно использованные записи удаляются пачками по индексу, пока размер не опустится ниже запаса
+        target = self.max_bytes * EVICT_TO_FRACTION if total > self.max_bytes else total
+        while total > target:
+            rows = connection.execute(
+                "SELECT key, size FROM docs ORDER BY last_access LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                total = 0
+                break
+            freed = []
+            for key, size in rows:
+                freed.append((key,))
+                total -= size
+                if total <= target:
+                    break
+            connection.executemany("DELETE FROM docs WHERE key = ?", freed)
+        connection.execute("UPDATE stats SET value = ? WHERE name = 'bytes'", (max(total, 0),))
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов за все время и размер кэша"""
+        self.flush()
+        with closing(self._connect()) as connection:
+            stats = dict(connection.execute("SELECT name, value FROM stats"))
+            (entries,) = connection.execute("SELECT COUNT(*) FROM docs").fetchone()
+        return {"hits": stats.get("hits", 0), "misses": stats.get("misses", 0), "entries": entries, "bytes": stats.get("bytes", 0)}
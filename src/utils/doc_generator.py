@@ -1,24 +1,272 @@
 from pathlib import Path
+import asyncio
+import json
 import os
 
-def generate_docs_for_group(group_idx, group, repo_path, file_details, docs_dir_path):
-    from src.services.ai_service import AIService 
+from config.config_app import Config
+from src.utils.analysis_store import content_hash
+from src.utils.python_outline import analyze_python_ast, format_python_outline
+from src.utils.tokenizer import count_tokens
 
-    ai_service = AIService()
-    group_dir = Path(docs_dir_path) / f"group_{group_idx}"
-    group_dir.mkdir(exist_ok=True)
-    
-    for file_path in group:
-        abs_path = os.path.join(repo_path, file_path)
-        if not os.path.exists(abs_path):
+def build_structure(file_path, content, details):
+    """Структура Python файла по AST для разбиения на фрагменты и структуры в промте (если файл
+    не разбирается - из regex-анализа). Строится только для файлов, которые режутся на фрагменты:
+    AST в разы дороже regex-анализа DependencyAnalyzer"""
+    if file_path.endswith(".py"):
+        return analyze_python_ast(content) or details.get("analysis")
+    return details.get("analysis")
+
+def build_outline(file_path, structure):
+    if not file_path.endswith(".py"):
+        return ""
+    return format_python_outline(structure)
+
+def _read_file(repo_path, file_path):
+    abs_path = os.path.join(repo_path, file_path)
+    if not os.path.exists(abs_path):
+        return None
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+# Путь файла -> номер группы его документации; лежит рядом с каталогами групп
+DOC_GROUPS_FILE = "groups.json"
+
+def _doc_path(docs_dir_path, group_idx, file_path):
+    # Каталоги файла сохраняются: одноименные файлы из разных пакетов не перезаписывают документацию друг друга
+    return Path(docs_dir_path) / f"group_{group_idx}" / f"{file_path}.md"
+
+def load_doc_groups(docs_dir_path):
+    """Путь файла -> номер группы. Без сохраненного списка он восстанавливается по документам на диске"""
+    try:
+        with open(Path(docs_dir_path) / DOC_GROUPS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    doc_groups = {}
+    for group_dir in Path(docs_dir_path).glob("group_*"):
+        for md_file in group_dir.rglob("*.md"):
+            doc_groups[md_file.relative_to(group_dir).as_posix()[:-3]] = int(group_dir.name.split("_")[-1])
+    return doc_groups
+
+def save_doc_groups(docs_dir_path, doc_groups):
+    Path(docs_dir_path).mkdir(parents=True, exist_ok=True)
+    with open(Path(docs_dir_path) / DOC_GROUPS_FILE, "w", encoding="utf-8") as f:
+        json.dump(doc_groups, f, ensure_ascii=False)
+
+def remove_doc(docs_dir_path, group_idx, file_path):
+    _doc_path(docs_dir_path, group_idx, file_path).unlink(missing_ok=True)
+
+def _write_doc(docs_dir_path, group_idx, file_path, documentation):
+    doc_path = _doc_path(docs_dir_path, group_idx, file_path)
+    doc_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(doc_path, "w", encoding="utf-8") as f:
+        f.write(documentation)
+
+async def _progress(on_progress, event, file_path):
+    if on_progress is not None:
+        await on_progress({"event": event, "file": file_path})
+
+def _input_hash(content, details):
+    return content_hash(json.dumps([details.get("imports", []), content], ensure_ascii=False).encode("utf-8"))
+
+def _checkpoint_valid(record, docs_dir_path, group_idx, file_path, content, details):
+    """Готовый файл пропускается, только если не изменился его код и на диске лежит та документация, что была записана"""
+    if record.get("group") != group_idx or record.get("input") != _input_hash(content, details):
+        return False
+    try:
+        with open(_doc_path(docs_dir_path, group_idx, file_path), "r", encoding="utf-8") as f:
+            return content_hash(f.read().encode("utf-8")) == record.get("doc")
+    except OSError:
+        return False
+
+def _finished_files(files, done, file_contents, file_details, docs_dir_path):
+    return {
+        file_path
+        for group_idx, file_path in files
+        if file_path in done and file_path in file_contents and _checkpoint_valid(
+            done[file_path], docs_dir_path, group_idx, file_path, file_contents[file_path], file_details.get(file_path, {})
+        )
+    }
+
+async def _save_checkpoint(checkpoints, group_idx, file_path, content, details, documentation):
+    if checkpoints is not None:
+        await checkpoints.save(file_path, {
+            "group": group_idx,
+            "input": _input_hash(content, details),
+            "doc": content_hash(documentation.encode("utf-8"))
+        })
+
+class DocStreamWriter:
+    """Пишет документацию в .md по мере ответа модели, чтобы файл был виден до конца генерации.
+    На диск уходят целые строки: отдельный поток на каждый кусок ответа дороже самого текста"""
+
+    def __init__(self, doc_path, on_first_text=None):
+        self.doc_path = doc_path
+        self.on_first_text = on_first_text
+        self.pending = []
+        self.file = None
+        self.discarded = False
+
+    async def write(self, text):
+        if self.discarded:
+            return
+        if self.file is None and not self.pending and self.on_first_text is not None:
+            await self.on_first_text()
+        self.pending.append(text)
+        if "\n" in text:
+            await self._flush()
+
+    async def _flush(self):
+        text = "".join(self.pending)
+        self.pending = []
+        if text:
+            await asyncio.to_thread(self._append, text)
+
+    def _append(self, text):
+        if self.discarded:
+            return
+        if self.file is None:
+            self.doc_path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.doc_path, "w", encoding="utf-8")
+        self.file.write(text)
+        self.file.flush()
+
+    async def close(self):
+        await self._flush()
+        if self.file is not None:
+            await asyncio.to_thread(self.file.close)
+
+    async def discard(self):
+        """Недописанный документ удаляется: оборванная документация хуже отсутствующей"""
+        self.pending = []
+        self.discarded = True
+        if self.file is not None:
+            file, self.file = self.file, None
+            await asyncio.to_thread(file.close)
+            await asyncio.to_thread(self.doc_path.unlink, True)
+
+async def generate_doc_for_file(
+    group_idx, file_path, repo_path, details, docs_dir_path, ai_service, content=None, on_progress=None, checkpoints=None
+):
+    """Генерирует документацию одного файла; диск и AST уходят в поток, чтобы не держать event loop.
+    При DOC_STREAMING документ дописывается на диск по мере ответа модели"""
+    try:
+        if content is None:
+            content = await asyncio.to_thread(_read_file, repo_path, file_path)
+            if content is None:
+                # Файл учтен в общем числе файлов: без события счетчик готовых никогда не сойдется
+                print(f"[!] Failed for {file_path}: file cannot be read")
+                await _progress(on_progress, "file_failed", file_path)
+                return
+        await _progress(on_progress, "file_started", file_path)
+        dependencies = details.get("imports", [])
+        structure, outline = details.get("analysis"), ""
+        if file_path.endswith(".py") and await asyncio.to_thread(ai_service.needs_split, content, file_path, dependencies):
+            structure = await asyncio.to_thread(build_structure, file_path, content, details)
+            outline = build_outline(file_path, structure)
+        args = (content, file_path, dependencies, outline, structure)
+        if Config.DOC_STREAMING:
+            writer = DocStreamWriter(
+                _doc_path(docs_dir_path, group_idx, file_path),
+                lambda: _progress(on_progress, "file_streaming", file_path)
+            )
+            try:
+                documentation = await ai_service.generate_documentation(*args, on_text=writer.write)
+            except Exception:
+                await writer.discard()
+                raise
+            await writer.close()
+        else:
+            documentation = await ai_service.generate_documentation(*args)
+        # Итоговый текст перезаписывает потоковый: в нем убраны пробелы по краям частей
+        await asyncio.to_thread(_write_doc, docs_dir_path, group_idx, file_path, documentation)
+        await _save_checkpoint(checkpoints, group_idx, file_path, content, details, documentation)
+        await _progress(on_progress, "file_done", file_path)
+    except Exception as e:
+        print(f"[!] Failed for {file_path}: {e}")
+        await _progress(on_progress, "file_failed", file_path)
+
+async def generate_docs_for_batch(group_idx, batch, file_details, docs_dir_path, ai_service, on_progress=None, checkpoints=None):
+    """Генерирует документацию нескольких мелких файлов одной группы одним запросом; `batch` - пары (путь, содержимое).
+    Ответ на пакет короткий и делится по разделителям, поэтому он не пишется потоком"""
+    paths = [file_path for file_path, _ in batch]
+    try:
+        for file_path in paths:
+            await _progress(on_progress, "file_started", file_path)
+        # Мелкие файлы идут в запрос целиком, структура файла им не нужна
+        items = [
+            {"path": file_path, "content": content, "dependencies": file_details.get(file_path, {}).get("imports", [])}
+            for file_path, content in batch
+        ]
+        docs = await ai_service.generate_batch_documentation(items)
+        for item in items:
+            documentation = docs[item["path"]]
+            await asyncio.to_thread(_write_doc, docs_dir_path, group_idx, item["path"], documentation)
+            await _save_checkpoint(
+                checkpoints, group_idx, item["path"], item["content"], file_details.get(item["path"], {}), documentation
+            )
+            await _progress(on_progress, "file_done", item["path"])
+    except Exception as e:
+        print(f"[!] Failed for batch {', '.join(paths)}: {e}")
+        for file_path in paths:
+            await _progress(on_progress, "file_failed", file_path)
+
+def plan_batches(files, file_contents):
+    """Делит файлы на пакеты мелких файлов одной группы (в пределах бюджета токенов и числа файлов) и одиночные файлы"""
+    batches, singles = [], []
+    open_batches = {}
+    for group_idx, file_path in files:
+        content = file_contents.get(file_path)
+        tokens = count_tokens(content) if content is not None else None
+        if tokens is None or tokens > Config.DOC_BATCH_FILE_MAX_TOKENS:
+            singles.append((group_idx, file_path))
             continue
-        try:
-            with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-            dependencies = file_details.get(file_path, {}).get("imports", [])
-            documentation = ai_service.generate_documentation_sync(content, file_path, dependencies) 
-            doc_path = group_dir / f"{os.path.basename(file_path)}.md"
-            with open(doc_path, "w", encoding="utf-8") as f:
-                f.write(documentation)
-        except Exception as e:
-            print(f"[!] Failed for {file_path}: {e}")
\ No newline at end of file
+
+        batch = open_batches.get(group_idx)
+        if batch is None or batch["tokens"] + tokens > Config.DOC_BATCH_MAX_TOKENS or len(batch["files"]) >= Config.DOC_BATCH_MAX_FILES:
+            batch = open_batches[group_idx] = {"group_idx": group_idx, "files": [], "tokens": 0}
+            batches.append(batch)
+        batch["files"].append((file_path, content))
+        batch["tokens"] += tokens
+
+    # Пакет из одного файла ничего не экономит
+    for batch in batches:
+        if len(batch["files"]) == 1:
+            singles.append((batch["group_idx"], batch["files"][0][0]))
+    return [batch for batch in batches if len(batch["files"]) > 1], singles
+
+async def generate_docs_async(
+    files, repo_path, file_details, docs_dir_path, ai_service, file_contents=None, on_progress=None, checkpoints=None
+):
+    """Генерирует документацию для списка (номер группы, путь файла) конкурентно в одном event loop.
+    Мелкие файлы одной группы уходят пакетами. Параллелизм и лимиты запросов ограничивает
+    движок генерации в `ai_service`. `on_progress` получает события по файлам: started, streaming, done,
+    failed и resumed. С `checkpoints` каждый готовый файл отмечается, а отмеченные в прошлых попытках пропускаются"""
+    file_contents = dict(file_contents or {})
+    missing = [file_path for _, file_path in files if file_path not in file_contents]
+    contents = await asyncio.gather(*(asyncio.to_thread(_read_file, repo_path, file_path) for file_path in missing))
+    file_contents.update((file_path, content) for file_path, content in zip(missing, contents) if content is not None)
+
+    if checkpoints is not None:
+        done = await checkpoints.load()
+        finished = await asyncio.to_thread(_finished_files, files, done, file_contents, file_details, docs_dir_path)
+        for file_path in finished:
+            await _progress(on_progress, "file_resumed", file_path)
+        files = [(group_idx, file_path) for group_idx, file_path in files if file_path not in finished]
+
+    batches, singles = plan_batches(files, file_contents)
+    await asyncio.gather(
+        *(
+            generate_docs_for_batch(
+                batch["group_idx"], batch["files"], file_details, docs_dir_path, ai_service, on_progress, checkpoints
+            )
+            for batch in batches
+        ),
+        *(
+            generate_doc_for_file(
+                group_idx, file_path, repo_path, file_details.get(file_path, {}),
+                docs_dir_path, ai_service, file_contents.get(file_path), on_progress, checkpoints
+            )
+            for group_idx, file_path in singles
+        )
+    )
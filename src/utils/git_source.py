@@ -0,0 +1,122 @@
+import os
+import subprocess
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.repo_walker import DEFAULT_IGNORED_DIRS, MAX_FILE_BYTES, IgnoreRules, is_ignored
+
+# Режимы записей дерева, которые не являются обычными файлами: ссылки и подмодули
+SKIPPED_MODES = {'120000', '160000'}
+
+
+class GitObjectReader:
+    """Один долгоживущий `git cat-file --batch` на все чтения: объекты идут через pipe без процесса на файл"""
+
+    def __init__(self, git_dir: str):
+        self.process = subprocess.Popen(
+            ["git", "--git-dir", git_dir, "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        # Анализатор и генерация читают из разных потоков executor'а, запрос и ответ не должны перемешаться
+        self.lock = threading.Lock()
+
+    def read(self, object_id: str) -> Optional[bytes]:
+        with self.lock:
+            self.process.stdin.write(f"{object_id}\n".encode("ascii"))
+            self.process.stdin.flush()
+            header = self.process.stdout.readline().decode("ascii").split()
+            if len(header) != 3:
+                return None
+            data = self.process.stdout.read(int(header[2]))
+            self.process.stdout.read(1)
+            return data
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process.stdout.close()
+
+
+class GitTreeSource:
+    """Файлы ревизии прямо из объектов репозитория (bare-зеркала), без рабочей копии на диске.
+
+    Список файлов дает `git ls-tree -r`, содержимое читается по требованию через `git cat-file --batch`.
+    SHA блоба - отпечаток содержимого, который известен без чтения файла.
+    """
+
+    def __init__(self, git_dir: str, rev: str, on_close: Optional[Callable[[], None]] = None):
+        self.git_dir = git_dir
+        self.rev = rev
+        self.on_close = on_close
+        self.blobs: Dict[str, Tuple[str, int]] = {}
+        self._list_tree()
+        self._reader = GitObjectReader(git_dir)
+
+    def _list_tree(self):
+        result = subprocess.run(
+            ["git", "--git-dir", self.git_dir, "ls-tree", "-r", "-z", "--long", "--full-tree", self.rev],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            raise ValueError(f"Failed to list {self.rev}: {result.stderr.decode('utf-8', errors='ignore').strip()}")
+
+        for record in result.stdout.split(b'\0'):
+            if not record:
+                continue
+            meta, path = record.split(b'\t', 1)
+            mode, kind, object_id, size = meta.decode("ascii").split()
+            if kind != "blob" or mode in SKIPPED_MODES:
+                continue
+            self.blobs[path.decode("utf-8", errors="surrogateescape")] = (object_id, int(size))
+
+    def walk(self, ignore_patterns: Optional[Iterable[str]] = None, max_file_bytes: int = MAX_FILE_BYTES) -> Iterator[Tuple[str, str]]:
+        """Отдает пары (путь с '/' в качестве разделителя, SHA блоба) по тем же правилам, что RepositoryWalker"""
+        base_rules = [IgnoreRules("", ignore_patterns or [])]
+        dir_rules: Dict[str, Optional[List[IgnoreRules]]] = {"": self._with_gitignore("", base_rules)}
+
+        for rel_path in sorted(self.blobs):
+            object_id, size = self.blobs[rel_path]
+            rules = self._dir_rules(os.path.dirname(rel_path), dir_rules)
+            if rules is None or is_ignored(rules, rel_path, False) or size > max_file_bytes:
+                continue
+            yield rel_path, object_id
+
+    def _dir_rules(self, rel_dir: str, dir_rules: Dict[str, Optional[List[IgnoreRules]]]) -> Optional[List[IgnoreRules]]:
+        """Правила, действующие внутри каталога, или None, если каталог игнорируется"""
+        if rel_dir in dir_rules:
+            return dir_rules[rel_dir]
+
+        parent_rules = self._dir_rules(os.path.dirname(rel_dir), dir_rules)
+        if parent_rules is None or os.path.basename(rel_dir) in DEFAULT_IGNORED_DIRS or is_ignored(parent_rules, rel_dir, True):
+            rules = None
+        else:
+            rules = self._with_gitignore(rel_dir, parent_rules)
+        dir_rules[rel_dir] = rules
+        return rules
+
+    def _with_gitignore(self, rel_dir: str, rules: List[IgnoreRules]) -> List[IgnoreRules]:
+        gitignore = f"{rel_dir}/.gitignore" if rel_dir else ".gitignore"
+        if gitignore not in self.blobs:
+            return rules
+        content = self.read(gitignore) or b""
+        return rules + [IgnoreRules(rel_dir, content.decode("utf-8", errors="ignore").splitlines())]
+
+    def blob_id(self, rel_path: str) -> Optional[str]:
+        blob = self.blobs.get(rel_path)
+        return blob[0] if blob else None
+
+    def read(self, rel_path: str) -> Optional[bytes]:
+        object_id = self.blob_id(rel_path)
+        if object_id is None:
+            return None
+        return self._reader.read(object_id)
+
+    def close(self):
+        self._reader.close()
+        if self.on_close is not None:
+            self.on_close()
+            self.on_close = None
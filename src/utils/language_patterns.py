@@ -0,0 +1,156 @@
+import re
+from typing import Dict, Pattern
+
+# Заранее скомпилированные регулярные выражения для всех парсеров DependencyAnalyzer.
+# Паттерны с общим префиксом объединены в один (например, `type X struct|interface` в Go),
+# чтобы файл проходился один раз. Паттерны, начинающиеся с разных слов, оставлены отдельными:
+# в CPython альтернация отключает быстрый поиск по литеральному префиксу и работает медленнее
+# нескольких отдельных проходов.
+
+PATTERNS: Dict[str, Dict[str, Pattern]] = {
+    "python": {
+        "functions": re.compile(r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "classes": re.compile(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        # `from x import *` дополнительно дает x/__init__.py; общий префикс позволяет искать оба случая одним проходом
+        "from_imports": re.compile(r'from\s+([a-zA-Z0-9_.]+)\s+import(\s+\*)?'),
+        "direct_imports": re.compile(r'^\s*import\s+([a-zA-Z0-9_.]+)', re.MULTILINE),
+    },
+    "javascript": {
+        "functions": re.compile(r'(?:function\s+([a-zA-Z0-9_]+)\s*\(([^)]*)\))|(?:const\s+([a-zA-Z0-9_]+)\s*=\s*\(([^)]*)\)\s*=>)'),
+        "classes": re.compile(r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "imports": re.compile(r'import.*?["\'](.+?)["\']'),
+        "requires": re.compile(r'require\(["\'](.+?)["\']\)'),
+    },
+    "html": {
+        "scripts": re.compile(r'<script.*?src=["\'](.+?)["\']'),
+        "links": re.compile(r'<link.*?href=["\'](.+?)["\']'),
+        "images": re.compile(r'<img.*?src=["\'](.+?)["\']'),
+        "anchors": re.compile(r'<a.*?href=["\'](.+?)["\']'),
+    },
+    "css": {
+        "imports": re.compile(r'@import\s+(?:url\()?["\'](.+?)["\']\)?'),
+        "urls": re.compile(r'url\(["\']?(.+?)["\']?\)'),
+    },
+    "sfc": {
+        "script": re.compile(r'<script[^>]*>([\s\S]*?)<\/script>'),
+        "tag": re.compile(r'<[^>]+>'),
+        "style": re.compile(r'<style[^>]*>([\s\S]*?)<\/style>'),
+        "template": re.compile(r'<template[^>]*>([\s\S]*?)<\/template>'),
+    },
+    "svelte": {
+        "variables": re.compile(r'let\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "functions": re.compile(r'function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "components": re.compile(r'<([A-Z][a-zA-Z0-9]*)'),
+        "elements": re.compile(r'<([a-z][a-zA-Z0-9-]*)'),
+        "rules": re.compile(r'([^{]+)\s*\{'),
+    },
+    "vue": {
+        "components": re.compile(r'components:\s*\{([^}]+)\}'),
+        "identifiers": re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "methods": re.compile(r'methods:\s*\{([^}]+)\}'),
+        "method_defs": re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+    },
+    "cpp": {
+        "functions": re.compile(r'([a-zA-Z_][a-zA-Z0-9_:<>]*)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)\s*\{'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "includes": re.compile(r'#include\s+[<"](.+?)[>"]'),
+    },
+    "csharp": {
+        "functions": re.compile(r'\b(?:public|private|protected|internal|static|\s)*\s*([a-zA-Z0-9_<>,\[\]]+)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "usings": re.compile(r'using\s+([a-zA-Z0-9_.]+);'),
+        "assemblies": re.compile(r'\[assembly:\s*[^\]]+\s*\(\s*@"([^"]+)"\s*\)\s*\]'),
+    },
+    "java": {
+        "functions": re.compile(r'\b(?:public|private|protected|static|\s)*\s*([a-zA-Z0-9_<>,\[\]]+)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "imports": re.compile(r'import\s+(?:static\s+)?([a-zA-Z0-9_.]+)\s*;'),
+        "packages": re.compile(r'package\s+([a-zA-Z0-9_.]+)\s*;'),
+    },
+    "go": {
+        "functions": re.compile(r'func\s+(?:\([^)]*\)\s*)?([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        # Одиночный импорт и блок import ( ... )
+        "imports": re.compile(r'import(?:\s+(?:\w+\s+)?"([^"]+)"|\s*\(\s*([^)]+)\s*\))'),
+        # Структуры и интерфейсы
+        "types": re.compile(r'type\s+([a-zA-Z_][a-zA-Z0-9_]*)\s+(struct|interface)'),
+    },
+    "rust": {
+        "functions": re.compile(r'\bfn\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "structs": re.compile(r'\bstruct\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "enums": re.compile(r'\benum\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "mods": re.compile(r'\b(?:pub\s+)?mod\s+([a-zA-Z0-9_]+)\s*;'),
+        "uses": re.compile(r'\buse\s+([a-zA-Z0-9_:]+)'),
+    },
+    "kotlin": {
+        "functions": re.compile(r'\bfun\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "imports": re.compile(r'import\s+([a-zA-Z0-9_.]+)'),
+        "packages": re.compile(r'package\s+([a-zA-Z0-9_.]+)'),
+    },
+    "swift": {
+        "functions": re.compile(r'\bfunc\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "structs": re.compile(r'\bstruct\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "enums": re.compile(r'\benum\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "protocols": re.compile(r'\bprotocol\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "imports": re.compile(r'import\s+([a-zA-Z0-9_]+)'),
+    },
+    "dart": {
+        "functions": re.compile(r'\b(?:void|int|double|String|bool|var|dynamic|const|final)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "imports": re.compile(r'import\s+[\'\"]([^\'\"]+)[\'\"]'),
+        "package_imports": re.compile(r'package:([^\'\"\s]+)'),
+    },
+    "ruby": {
+        "methods": re.compile(r'\bdef\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(?([^)]*)\)?'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "modules": re.compile(r'\bmodule\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "requires": re.compile(r'require\s+[\'"]([^\'"]+)[\'"]'),
+        "loads": re.compile(r'load\s+[\'"]([^\'"]+)[\'"]'),
+        "autoloads": re.compile(r'autoload\s+:[A-Za-z0-9_]+\s*,\s*[\'"]([^\'"]+)[\'"]'),
+    },
+    "php": {
+        "functions": re.compile(r'\bfunction\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "requires": re.compile(r'(?:require|include)(?:_once)?\s*[\'"]([^\'"]+)[\'"]'),
+        "uses": re.compile(r'use\s+([a-zA-Z0-9_\\]+)'),
+        "autoloads": re.compile(r'spl_autoload_register\s*\(.*?["\']([^"\']+)["\']'),
+    },
+    "haskell": {
+        "functions": re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*::\s*([^=]+)='),
+        "data_types": re.compile(r'\bdata\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "classes": re.compile(r'\bclass\s+([a-zA-Z_][a-zA-Z0-9_]*)'),
+        "imports": re.compile(r'import\s+(?:qualified\s+)?([a-zA-Z0-9.]+)'),
+    },
+    "lua": {
+        "functions": re.compile(r'\bfunction\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)'),
+        "tables": re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\{'),
+        "requires": re.compile(r'require\s*\(?[\'"]([^\'"]+)[\'"]\)?'),
+    },
+    "r": {
+        "imports": re.compile(r'library\s*\(([^)]+)\)'),
+        "sources": re.compile(r'source\s*\(["\']([^"\']+)["\']\)'),
+    },
+    "julia": {
+        "imports": re.compile(r'(?:using|import)\s+([a-zA-Z0-9.]+)'),
+        "includes": re.compile(r'include\s*\(["\']([^"\']+)["\']\)'),
+    },
+    "zig": {
+        "imports": re.compile(r'@import\s*\(["\']([^"\']+)["\']\)'),
+    },
+    "nim": {
+        "imports": re.compile(r'import\s+([a-zA-Z0-9.]+)'),
+        "includes": re.compile(r'include\s+["\']([^"\']+)["\']'),
+    },
+    "v": {
+        "imports": re.compile(r'import\s+([a-zA-Z0-9.]+)'),
+    },
+    "proto": {
+        "imports": re.compile(r'import\s+"([^"]+)"'),
+    },
+    "shell": {
+        "sources": re.compile(r'source\s+["\']?([^"\'\s]+)'),
+        "dots": re.compile(r'\.\s+["\']?([^"\'\s]+)'),
+        "execs": re.compile(r'(?:sh|bash|\./)\s+([^\s&|;]+)'),
+    },
+}
@@ -0,0 +1,17 @@
+from bisect import bisect_left
+from typing import List
+
+
+class LineIndex:
+    """Индекс смещений переводов строк: номер строки по позиции за O(log n) без копирования префикса"""
+
+    def __init__(self, content: str):
+        self.newlines: List[int] = []
+        position = content.find('\n')
+        while position != -1:
+            self.newlines.append(position)
+            position = content.find('\n', position + 1)
+
+    def line_of(self, position: int) -> int:
+        """Номер строки (с 1), на которой находится символ с данным смещением"""
+        return bisect_left(self.newlines, position) + 1
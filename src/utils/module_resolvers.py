@@ -0,0 +1,248 @@
+import os
+import re
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Файлы, по которым определяются корни пакетов, модулей и крейтов
+PROJECT_MARKERS = {'go.mod', 'Cargo.toml', 'setup.py', 'setup.cfg', 'pyproject.toml'}
+
+PYTHON_ROOT_MARKERS = {'setup.py', 'setup.cfg', 'pyproject.toml'}
+C_INCLUDE_DIRS = ('include', 'inc')
+
+
+def _ancestors(rel_path: str) -> List[str]:
+    """Каталоги-предки файла от ближайшего к корню репозитория ('' - корень)"""
+    result = []
+    current = os.path.dirname(rel_path)
+    while current:
+        result.append(current)
+        current = os.path.dirname(current)
+    result.append("")
+    return result
+
+
+def _join(base: str, *parts: str) -> str:
+    return os.path.normpath(os.path.join(base, *parts)) if base else os.path.normpath(os.path.join(*parts))
+
+
+def _nearest(current_file: str, candidates: Iterable[str]) -> Optional[str]:
+    """Выбирает кандидата с самым длинным общим префиксом пути с импортирующим файлом"""
+    current_parts = current_file.split(os.sep)
+
+    def score(path: str) -> Tuple[int, int]:
+        common = 0
+        for a, b in zip(current_parts, path.split(os.sep)):
+            if a != b:
+                break
+            common += 1
+        return -common, len(path)
+
+    candidates = list(candidates)
+    return min(candidates, key=score) if candidates else None
+
+
+class ModuleIndex:
+    """Предрассчитанный индекс файлов репозитория для языковых резолверов"""
+
+    def __init__(self, files: Iterable[str], markers: Iterable[str], read_text: Callable[[str], Optional[str]]):
+        self.files = set(files)
+        self.suffix_index: Dict[str, List[str]] = defaultdict(list)
+        self.dir_files: Dict[str, List[str]] = defaultdict(list)
+        self.dir_suffix_index: Dict[str, List[str]] = defaultdict(list)
+        self.python_roots: List[str] = []
+        self.go_modules: Dict[str, str] = {}
+        self.rust_crates: Dict[str, str] = {}
+
+        for rel_path in self.files:
+            parts = rel_path.split(os.sep)
+            for i in range(len(parts)):
+                self.suffix_index[os.sep.join(parts[i:])].append(rel_path)
+            self.dir_files[os.path.dirname(rel_path)].append(rel_path)
+
+        for dir_path in self.dir_files:
+            parts = dir_path.split(os.sep) if dir_path else []
+            for i in range(len(parts)):
+                self.dir_suffix_index[os.sep.join(parts[i:])].append(dir_path)
+
+        for marker in markers:
+            marker_dir = os.path.dirname(marker)
+            name = os.path.basename(marker)
+            if name in PYTHON_ROOT_MARKERS:
+                self.python_roots.append(marker_dir)
+                self.python_roots.append(_join(marker_dir, "src"))
+            elif name == 'go.mod':
+                module = re.search(r'^\s*module\s+(\S+)', read_text(marker) or "", re.MULTILINE)
+                if module:
+                    self.go_modules[module.group(1).strip('"')] = marker_dir
+            elif name == 'Cargo.toml':
+                package = re.search(r'\[package\][^\[]*?^\s*name\s*=\s*"([^"]+)"', read_text(marker) or "", re.MULTILINE | re.DOTALL)
+                if package:
+                    self.rust_crates[package.group(1).replace('-', '_')] = _join(marker_dir, "src")
+
+        self.python_roots = list(dict.fromkeys(self.python_roots))
+
+
+class ModuleResolver:
+    """Базовый резолвер: переводит импорт языка в файлы репозитория"""
+
+    def context_key(self, current_file: str) -> str:
+        """Часть ключа кэша, от которой зависит результат (по умолчанию - каталог файла)"""
+        return os.path.dirname(current_file)
+
+    def resolve(self, index: ModuleIndex, current_file: str, dep: str) -> List[str]:
+        """Файлы зависимости. Результат кэшируется по `context_key` для всех файлов контекста,
+        поэтому сам `current_file` из него не исключается - это делает анализатор"""
+        return []
+
+
+class PythonResolver(ModuleResolver):
+    """`pkg/mod.py` от `_parse_python` ищется от каталогов-предков и корней пакетов (setup.py, pyproject.toml, src/)"""
+
+    def resolve(self, index: ModuleIndex, current_file: str, dep: str) -> List[str]:
+        if not dep.endswith('.py') or dep == '.py':
+            return []
+
+        candidates = [dep]
+        if os.path.basename(dep) != '__init__.py':
+            candidates.append(os.path.join(dep[:-3], '__init__.py'))
+
+        for root in list(dict.fromkeys(_ancestors(current_file) + index.python_roots)):
+            for candidate in candidates:
+                path = _join(root, candidate)
+                if path in index.files:
+                    return [path]
+        return []
+
+
+class JvmResolver(ModuleResolver):
+    """Java/Kotlin/Scala: полное имя класса `com.foo.Bar` ищется как суффикс пути `com/foo/Bar.<ext>`"""
+
+    EXTENSIONS = ('.java', '.kt', '.scala', '.groovy')
+
+    def resolve(self, index: ModuleIndex, current_file: str, dep: str) -> List[str]:
+        parts = [part for part in dep.split('.') if part]
+        # Статические импорты указывают на член класса, поэтому укорачиваем имя, пока не найдем файл
+        for length in range(len(parts), 1, -1):
+            for ext in self.EXTENSIONS:
+                matches = index.suffix_index.get(os.path.join(*parts[:length]) + ext)
+                if matches:
+                    return [_nearest(current_file, matches)]
+        return []
+
+
+class CSharpResolver(ModuleResolver):
+    """C#: пространство имен `A.B.C` сопоставляется каталогу `A/B/C` со всеми его .cs файлами"""
+
+    def resolve(self, index: ModuleIndex, current_file: str, dep: str) -> List[str]:
+        parts = [part for part in dep.split('.') if part]
+        if len(parts) < 2:
+            return []
+
+        dirs = index.dir_suffix_index.get(os.path.join(*parts))
+        if not dirs:
+            return []
+        namespace_dir = _nearest(current_file, dirs)
+        return [path for path in index.dir_files[namespace_dir] if path.endswith('.cs')]
+
+
+class GoResolver(ModuleResolver):
+    """Go: путь импорта внутри модуля из go.mod указывает на каталог пакета"""
+
+    def resolve(self, index: ModuleIndex, current_file: str, dep: str) -> List[str]:
+        dep = dep.split()[-1].strip('"') if dep.strip() else ""
+        for module, module_dir in sorted(index.go_modules.items(), key=lambda item: -len(item[0])):
+            if dep != module and not dep.startswith(module + '/'):
+                continue
+            package_dir = _join(module_dir, dep[len(module):].strip('/')) if dep != module else module_dir
+            package_dir = "" if package_dir == "." else package_dir
+            return [
+                path for path in index.dir_files.get(package_dir, [])
+                if path.endswith('.go') and not path.endswith('_test.go')
+            ]
+        return []
+
+
+class RustResolver(ModuleResolver):
+    """Rust: `crate::`, `self::`, `super::` и крейты рабочего пространства переводятся в файлы модулей"""
+
+    def context_key(self, current_file: str) -> str:
+        return current_file
+
+    def resolve(self, index: ModuleIndex, current_file: str, dep: str) -> List[str]:
+        if dep.endswith(os.sep + 'mod.rs'):
+            segments = dep[:-len(os.sep + 'mod.rs')].split(os.sep)
+        elif dep.endswith('.rs'):
+            segments = dep[:-3].split(os.sep)
+        else:
+            return []
+
+        head, rest = segments[0], segments[1:]
+        if head == 'crate':
+            base = self._crate_root(index, current_file)
+        elif head == 'self':
+            base = self._module_dir(current_file)
+        elif head == 'super':
+            base = os.path.dirname(self._module_dir(current_file))
+            while rest and rest[0] == 'super':
+                base = os.path.dirname(base)
+                rest = rest[1:]
+        elif head in index.rust_crates:
+            base = index.rust_crates[head]
+        else:
+            return []
+
+        for length in range(len(rest), 0, -1):
+            for candidate in (_join(base, *rest[:length]) + '.rs', _join(base, *rest[:length], 'mod.rs')):
+                if candidate in index.files:
+                    return [candidate]
+
+        if head in index.rust_crates:
+            for root_file in ('lib.rs', 'main.rs'):
+                candidate = _join(base, root_file)
+                if candidate in index.files:
+                    return [candidate]
+        return []
+
+    def _module_dir(self, current_file: str) -> str:
+        name = os.path.basename(current_file)
+        if name in ('mod.rs', 'lib.rs', 'main.rs'):
+            return os.path.dirname(current_file)
+        return os.path.splitext(current_file)[0]
+
+    def _crate_root(self, index: ModuleIndex, current_file: str) -> str:
+        for ancestor in _ancestors(current_file):
+            if _join(ancestor, 'lib.rs') in index.files or _join(ancestor, 'main.rs') in index.files:
+                return ancestor
+        return os.path.dirname(current_file)
+
+
+class IncludeResolver(ModuleResolver):
+    """C/C++ и Protocol Buffers: include ищется от каталогов-предков и их include/, затем по суффиксу пути"""
+
+    def resolve(self, index: ModuleIndex, current_file: str, dep: str) -> List[str]:
+        dep = os.path.normpath(dep)
+        if dep.startswith('..') or os.path.isabs(dep):
+            return []
+
+        for ancestor in _ancestors(current_file):
+            for include_dir in ("",) + C_INCLUDE_DIRS:
+                candidate = _join(ancestor, include_dir, dep)
+                if candidate in index.files:
+                    return [candidate]
+
+        if os.sep in dep:
+            matches = index.suffix_index.get(dep)
+            if matches:
+                return [_nearest(current_file, matches)]
+        return []
+
+
+def build_resolvers() -> Dict[str, ModuleResolver]:
+    """Сопоставляет расширение импортирующего файла резолверу его языка"""
+    python, jvm, csharp = PythonResolver(), JvmResolver(), CSharpResolver()
+    go, rust, include = GoResolver(), RustResolver(), IncludeResolver()
+
+    resolvers: Dict[str, ModuleResolver] = {'.py': python, '.cs': csharp, '.go': go, '.rs': rust}
+    resolvers.update({ext: jvm for ext in JvmResolver.EXTENSIONS})
+    resolvers.update({ext: include for ext in ('.c', '.cpp', '.h', '.hpp', '.proto')})
+    return resolvers
@@ -0,0 +1,158 @@
+import ast
+from typing import Dict, List, Optional, Union
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+# Длина docstring в структуре файла: первой строки обычно достаточно, чтобы модель поняла назначение
+DOCSTRING_MAX_CHARS = 200
+
+
+def _docstring(node: ast.AST) -> Optional[str]:
+    docstring = ast.get_docstring(node, clean=True)
+    if not docstring:
+        return None
+    summary = docstring.strip().split("\n\n", 1)[0].replace("\n", " ")
+    return summary[:DOCSTRING_MAX_CHARS]
+
+
+def _decorators(node: Union[FunctionNode, ast.ClassDef]) -> List[str]:
+    return [ast.unparse(decorator) for decorator in node.decorator_list]
+
+
+def _params(args: ast.arguments) -> List[str]:
+    """Параметры в том же виде, что и у regex-анализатора: `name: annotation = default`"""
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    params = []
+
+    def render(arg: ast.arg, default: Optional[ast.expr], prefix: str = "") -> str:
+        text = prefix + arg.arg
+        if arg.annotation is not None:
+            text += f": {ast.unparse(arg.annotation)}"
+        if default is not None:
+            text += f" = {ast.unparse(default)}"
+        return text
+
+    for arg, default in zip(positional, defaults):
+        params.append(render(arg, default))
+    if args.posonlyargs:
+        params.insert(len(args.posonlyargs), "/")
+    if args.vararg:
+        params.append(render(args.vararg, None, "*"))
+    elif args.kwonlyargs:
+        params.append("*")
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        params.append(render(arg, default))
+    if args.kwarg:
+        params.append(render(args.kwarg, None, "**"))
+    return params
+
+
+def _function(node: FunctionNode) -> Dict:
+    params = _params(node.args)
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    signature = f"{prefix} {node.name}({', '.join(params)})"
+    if node.returns is not None:
+        signature += f" -> {ast.unparse(node.returns)}"
+
+    return {
+        "name": node.name,
+        "params": params,
+        "line": node.lineno,
+        "end_line": node.end_lineno,
+        "decorators": _decorators(node),
+        "signature": signature,
+        "docstring": _docstring(node),
+        "is_async": isinstance(node, ast.AsyncFunctionDef),
+    }
+
+
+def _class(node: ast.ClassDef) -> Dict:
+    return {
+        "name": node.name,
+        "line": node.lineno,
+        "end_line": node.end_lineno,
+        "bases": [ast.unparse(base) for base in node.bases],
+        "decorators": _decorators(node),
+        "docstring": _docstring(node),
+        "methods": [_function(item) for item in node.body if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))],
+        "classes": [_class(item) for item in node.body if isinstance(item, ast.ClassDef)],
+    }
+
+
+def analyze_python_ast(content: str) -> Optional[Dict]:
+    """Структура Python файла по AST; None, если файл не разбирается (тогда используется regex-анализатор)"""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+
+    analysis = {
+        "parser": "ast",
+        "docstring": _docstring(tree),
+        "functions": [],
+        "classes": [],
+        "global_vars": [],
+    }
+
+    # Обходим только верхний уровень модуля и тела классов: вложенные функции не попадают в структуру
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            analysis["functions"].append(_function(node))
+        elif isinstance(node, ast.ClassDef):
+            analysis["classes"].append(_class(node))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    analysis["global_vars"].append({"name": target.id, "line": node.lineno})
+
+    return analysis
+
+
+def _span(node: Dict) -> str:
+    if node.get("end_line"):
+        return f"строки {node['line']}-{node['end_line']}"
+    return f"строка {node['line']}"
+
+
+def _format_function(function: Dict, indent: str) -> List[str]:
+    lines = [f"{indent}@{decorator}" for decorator in function.get("decorators", [])]
+    signature = function.get("signature") or f"def {function['name']}({', '.join(function.get('params', []))})"
+    lines.append(f"{indent}{signature}  # {_span(function)}")
+    if function.get("docstring"):
+        lines.append(f'{indent}    """{function["docstring"]}"""')
+    return lines
+
+
+def _format_class(cls: Dict, indent: str) -> List[str]:
+    lines = [f"{indent}@{decorator}" for decorator in cls.get("decorators", [])]
+    bases = f"({', '.join(cls['bases'])})" if cls.get("bases") else ""
+    lines.append(f"{indent}class {cls['name']}{bases}:  # {_span(cls)}")
+    if cls.get("docstring"):
+        lines.append(f'{indent}    """{cls["docstring"]}"""')
+    for nested in cls.get("classes", []):
+        lines.extend(_format_class(nested, indent + "    "))
+    for method in cls.get("methods", []):
+        lines.extend(_format_function(method, indent + "    "))
+    return lines
+
+
+def format_python_outline(analysis: Dict) -> str:
+    """Компактная структура файла (сигнатуры, декораторы, docstring) для промта.
+
+    Принимает и результат regex-анализатора: тогда в структуре только имена, параметры и строки.
+    """
+    if not analysis:
+        return ""
+
+    lines = []
+    if analysis.get("docstring"):
+        lines.append(f'"""{analysis["docstring"]}"""')
+    if analysis.get("global_vars"):
+        lines.append("# Глобальные переменные: " + ", ".join(var["name"] for var in analysis["global_vars"]))
+    for cls in analysis.get("classes", []):
+        lines.extend(_format_class(cls, ""))
+    for function in analysis.get("functions", []):
+        lines.extend(_format_function(function, ""))
+    return "\n".join(lines)
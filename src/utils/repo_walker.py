@@ -0,0 +1,199 @@
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+
+# Каталоги, которые никогда не анализируются: VCS, зависимости, окружения, сборка и собственные отчеты анализатора
+DEFAULT_IGNORED_DIRS = {
+    '.git', '.hg', '.svn',
+    'node_modules', 'bower_components', 'vendor', 'site-packages',
+    'venv', '.venv', '__pycache__', '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache',
+    'dist', 'build', 'target', 'out', '.next', '.nuxt', '.svelte-kit', '.gradle', 'coverage', '.idea', '.vscode',
+    '_dependency_reports', '_dependency_visualization',
+}
+
+# Файлы больше этого размера почти всегда сгенерированы: дампы, бандлы, фикстуры
+MAX_FILE_BYTES = 1_000_000
+
+SNIFF_BYTES = 8192
+# Строка такой длины в начале файла - признак минифицированного кода
+MINIFIED_LINE_CHARS = 1000
+MINIFIED_SUFFIXES = ('.min.js', '.min.css', '.min.mjs', '-min.js', '.bundle.js')
+
+
+def _translate(pattern: str) -> str:
+    """Переводит glob-шаблон .gitignore в регулярное выражение (без якорей)"""
+    result = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            result.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == len(pattern):
+            result.append('/.*')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            result.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            result.append('[^/]*')
+        elif char == '?':
+            result.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                result.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                result.append(f'[{body}]')
+                i = end
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            result.append(re.escape(pattern[i]))
+        else:
+            result.append(re.escape(char))
+        i += 1
+    return ''.join(result)
+
+
+class IgnoreRules:
+    """Правила одного файла .gitignore (или списка из настроек), применяемые к путям относительно его каталога"""
+
+    def __init__(self, base_dir: str, lines: Iterable[str]):
+        self.base_dir = base_dir
+        self.rules: List[Tuple[Pattern, bool, bool, bool]] = []
+
+        for line in lines:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # Шаблон со слешем в начале или середине привязан к каталогу .gitignore, без слеша - совпадает на любой глубине
+            anchored = '/' in line
+            regex = re.compile('^' + _translate(line.lstrip('/')) + '$')
+            self.rules.append((regex, negated, dir_only, anchored))
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True - путь игнорируется, False - явно возвращен через `!`, None - правила о нем молчат"""
+        if self.base_dir:
+            if not rel_path.startswith(self.base_dir + '/'):
+                return None
+            rel_path = rel_path[len(self.base_dir) + 1:]
+        name = rel_path.rsplit('/', 1)[-1]
+
+        decision = None
+        for regex, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path if anchored else name):
+                decision = not negated
+        return decision
+
+
+def _read_gitignore(path: str) -> List[str]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.readlines()
+    except OSError:
+        return []
+
+
+def is_generated_file(abs_path: str) -> bool:
+    """Определяет бинарный или минифицированный файл по имени и первым килобайтам содержимого"""
+    if abs_path.endswith(MINIFIED_SUFFIXES):
+        return True
+    try:
+        with open(abs_path, "rb") as f:
+            sample = f.read(SNIFF_BYTES)
+    except OSError:
+        return True
+    return is_generated_content(abs_path, sample)
+
+
+def is_generated_content(path: str, content: bytes) -> bool:
+    """То же для уже прочитанного содержимого (например, объекта git)"""
+    if path.endswith(MINIFIED_SUFFIXES):
+        return True
+    sample = content[:SNIFF_BYTES]
+    if b'\0' in sample:
+        return True
+    first_line = sample.split(b'\n', 1)[0]
+    return len(first_line) >= MINIFIED_LINE_CHARS or (len(sample) == SNIFF_BYTES and sample.count(b'\n') < 3)
+
+
+def is_ignored(rules: List[IgnoreRules], rel_path: str, is_dir: bool) -> bool:
+    # Как в git: побеждает последнее совпавшее правило, более глубокие .gitignore идут позже
+    ignored = False
+    for rule_set in rules:
+        decision = rule_set.match(rel_path, is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+
+class RepositoryWalker:
+    """Обход репозитория на os.scandir: игнорируемые каталоги отсекаются до спуска в них.
+
+    Учитывает DEFAULT_IGNORED_DIRS, .gitignore на всех уровнях и дополнительные шаблоны
+    из настроек (синтаксис .gitignore относительно корня), пропускает файлы больше `max_file_bytes`.
+    """
+
+    def __init__(self, repo_path: str, ignore_patterns: Optional[Iterable[str]] = None, max_file_bytes: int = MAX_FILE_BYTES):
+        self.repo_path = repo_path
+        self.max_file_bytes = max_file_bytes
+        self.base_rules = [IgnoreRules("", ignore_patterns or [])]
+
+    def walk(self) -> Iterator[Tuple[str, str]]:
+        """Отдает пары (путь относительно репозитория с '/' в качестве разделителя, абсолютный путь)"""
+        stack = [("", self.repo_path, self.base_rules)]
+        while stack:
+            rel_dir, abs_dir, rules = stack.pop()
+
+            gitignore = os.path.join(abs_dir, '.gitignore')
+            if os.path.isfile(gitignore):
+                rules = rules + [IgnoreRules(rel_dir, _read_gitignore(gitignore))]
+
+            try:
+                entries = sorted(os.scandir(abs_dir), key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not entry.is_file(follow_symlinks=False):
+                        continue
+                except OSError:
+                    continue
+
+                if is_dir and entry.name in DEFAULT_IGNORED_DIRS:
+                    continue
+                if is_ignored(rules, rel_path, is_dir):
+                    continue
+
+                if is_dir:
+                    subdirs.append((rel_path, entry.path, rules))
+                else:
+                    try:
+                        if entry.stat(follow_symlinks=False).st_size > self.max_file_bytes:
+                            continue
+                    except OSError:
+                        continue
+                    yield rel_path, entry.path
+
+            stack.extend(reversed(subdirs))
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import socket
+from typing import Optional
+
+from config.config_app import Config
+
+# Словарь cl100k близок к BPE-токенизаторам современных моделей, в том числе deepseek
+TOKENIZER_ENCODING = "cl100k_base"
+# Откуда tiktoken берет словарь; в кэше он лежит под sha1 этого адреса
+TOKENIZER_VOCAB_URL = "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+PREFETCH_TIMEOUT_SECONDS = 60
+# Без tiktoken (или без скачанного словаря) токены оцениваются по байтам UTF-8: код дает ~3 байта на токен
+BYTES_PER_TOKEN = 3
+
+_encoding = None
+_loaded = False
+
+
+def _vocab_path() -> str:
+    return os.path.join(Config.TIKTOKEN_CACHE_DIR, hashlib.sha1(TOKENIZER_VOCAB_URL.encode()).hexdigest())
+
+
+def _load_encoding():
+    os.environ["TIKTOKEN_CACHE_DIR"] = Config.TIKTOKEN_CACHE_DIR
+    import tiktoken
+    return tiktoken.get_encoding(TOKENIZER_ENCODING)
+
+
+def _get_encoding() -> Optional[object]:
+    global _encoding, _loaded
+    if not _loaded:
+        _loaded = True
+        # tiktoken скачивает отсутствующий словарь без таймаута: без сети запрос повис бы,
+        # поэтому в работе используется только заранее скачанный словарь
+        if not os.path.exists(_vocab_path()):
+            print(f"[!] tiktoken vocabulary is not in {Config.TIKTOKEN_CACHE_DIR}, token counts are estimated "
+                  f"(run python -m src.utils.tokenizer to download it)")
+            return None
+        try:
+            _encoding = _load_encoding()
+        except Exception as e:
+            print(f"[!] tiktoken is unavailable, token counts are estimated: {e}")
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Число токенов текста локальным BPE-токенизатором"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text.encode("utf-8")) // BYTES_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def prefetch():
+    """Скачивает словарь в TIKTOKEN_CACHE_DIR (при установке или сборке образа)"""
+    os.makedirs(Config.TIKTOKEN_CACHE_DIR, exist_ok=True)
+    socket.setdefaulttimeout(PREFETCH_TIMEOUT_SECONDS)
+    _load_encoding()
+    print(f"[*] tiktoken vocabulary saved to {Config.TIKTOKEN_CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    prefetch()
@@ -0,0 +1,84 @@
+"""Воркер очереди обработки репозиториев: python -m src.worker
+
+Процессов можно запускать сколько угодно, на одной или разных машинах: общие лимиты
+и распределение задач держит очередь в Redis.
+"""
+from typing import Dict, Optional
+import asyncio, signal, uuid
+
+from sqlalchemy import select
+
+from config.config_app import Config
+from src.database import async_session
+from src.http_clients import http_clients
+from src.models.main_model import GitHubAuth
+from src.services.job_queue import job_queue
+from src.services.repo_service import RepositoryService
+
+# Задачи, которые забирают репозиторий с GitHub и без токена пользователя не выполнятся (приватные репозитории)
+GITHUB_JOB_KINDS = {"repository", "update"}
+
+
+async def _get_github_token(session, user_id: uuid.UUID) -> Optional[str]:
+    result = await session.execute(select(GitHubAuth).where(GitHubAuth.user_id == user_id))
+    github_auth = result.scalars().first()
+    return github_auth.access_token if github_auth else None
+
+
+async def _heartbeat(job_id: str):
+    while True:
+        await asyncio.sleep(Config.JOB_LEASE_SECONDS / 3)
+        await job_queue.heartbeat(job_id)
+
+
+async def run_job(job: Dict):
+    user_id = uuid.UUID(job["user_id"])
+    async with async_session() as session:
+        heartbeat = asyncio.create_task(_heartbeat(job["id"]))
+        try:
+            github_token = None
+            if job["kind"] in GITHUB_JOB_KINDS:
+                github_token = await _get_github_token(session, user_id)
+                if not github_token:
+                    raise RuntimeError("GitHub account is not linked: repository cannot be fetched")
+            await RepositoryService(session, github_token).run_job(job)
+        except Exception as e:
+            print(f"[!] Job {job['id']} attempt {job['attempts']} failed: {e}")
+            if not await job_queue.fail(job["id"], str(e)):
+                await RepositoryService(session, None).notify_failed(user_id, uuid.UUID(job["payload"]["repo_id"]), str(e))
+        else:
+            await job_queue.complete(job["id"])
+        finally:
+            heartbeat.cancel()
+
+
+async def worker_slot(stop: asyncio.Event):
+    """Берет и выполняет задачи по одной, пока не пришел сигнал остановки"""
+    while not stop.is_set():
+        await job_queue.recover()
+        job = await job_queue.claim()
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), Config.JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await run_job(job)
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    # Начатые задачи доделываются; задачи убитого воркера вернет в очередь истекшая аренда
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await http_clients.startup()
+    try:
+        await asyncio.gather(*(worker_slot(stop) for _ in range(Config.JOB_WORKER_CONCURRENCY)))
+    finally:
+        await http_clients.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -317,12 +317,12 @@ document.addEventListener('DOMContentLoaded', function() {
             }
             
             // Проверка расширения
-            const validExtensions = ['.zip', '.rar', '.7zip'];
+            const validExtensions = ['.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz'];
             const fileName = file.name.toLowerCase();
             const isValid = validExtensions.some(ext => fileName.endsWith(ext));
             
             if (!isValid) {
-                fileError.textContent = 'Поддерживаются только ZIP, RAR и 7ZIP архивы';
+                fileError.textContent = 'Поддерживаются только ZIP и TAR (gz, bz2, xz) архивы';
                 fileLabel.style.borderColor = 'var(--neon-accent)';
                 return;
             }